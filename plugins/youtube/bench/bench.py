@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the youtube plugin.
+
+Times every action in main.COMMANDS (cold with --no-cache, and warm from the
+local cache) plus the pure helpers over large synthetic inputs, against the
+stand-ins in standins.py. No network access is needed. Results are written as a
+JSON report that can be diffed, or compared against a previous report.
+
+Usage: bench.py [--iterations=5] [--latency=0.02] [--snippets=2000] [--comments=500]
+                [--failure-rate=0.0] [--observability] [--output=FILE] [--compare=FILE] [--only=NAME]
+
+The plugin runs against a temporary home directory; overrides that would point it
+at the real cache, quota ledger, or event log are cleared first. Observability
+spans are off unless --observability is given (they then go to the temporary home).
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import standins
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+CHANNEL_URL = "https://www.youtube.com/@benchmark"
+
+# Actions that never return on their own are not timed
+SKIPPED_ACTIONS = {"serve"}
+
+# Overrides that would point the plugin at the developer's real cache, quota, or event log
+ISOLATED_ENV = ("PAIS_YOUTUBE_CACHE_DIR", "PAIS_YOUTUBE_CACHE_MAX_MB", "PAIS_OBSERVABILITY_FILE", "YOUTUBE_API_QUOTA")
+
+# Actions that need an optional dependency would only time its ImportError without it
+ACTION_REQUIRES = {"export": "pyarrow"}
+
+
+def parse_options(args: list[str]) -> dict[str, str]:
+    options = {}
+    for arg in args:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value or "true"
+    return options
+
+
+def plugin_version() -> str | None:
+    match = re.search(r"^\s+version:\s*(\S+)", (PLUGIN_DIR / "plugin.yaml").read_text(), re.M)
+    return match.group(1) if match else None
+
+
+def summarize_timings(timings: list[float]) -> dict[str, float]:
+    return {
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+    }
+
+
+def time_case(
+    run: Callable[[], Any], iterations: int, setup: Callable[[], None] | None = None
+) -> tuple[dict[str, Any], Any]:
+    """Time run() over several iterations; returns the timings, with upstream calls, and the last run's value."""
+    timings = []
+    calls: dict[str, int] = {}
+    extra: Any = None
+    for _ in range(iterations):
+        if setup:
+            setup()
+        standins.take_calls()
+        start = time.perf_counter()
+        extra = run()
+        timings.append(time.perf_counter() - start)
+        calls = standins.take_calls()
+
+    return {**summarize_timings(timings), "iterations": iterations, "upstream_calls": calls}, extra
+
+
+def action_cases(main: Any, workdir: Path) -> dict[str, tuple[list[str], Callable[[], None] | None]]:
+    """Arguments (and per-iteration setup) for every action in the commands table."""
+    batch_file = workdir / "batch.txt"
+    batch_file.write_text("\n".join([VIDEO_URL, CHANNEL_URL]) + "\n")
+    sync_dir = workdir / "sync-output"
+    export_dir = workdir / "export"
+
+    special: dict[str, tuple[list[str], Callable[[], None] | None]] = {
+        "comments": ([VIDEO_URL, "0"], None),
+        "batch": ([str(batch_file), "--resources=info,transcript"], None),
+        "sync": ([CHANNEL_URL, f"--output-dir={sync_dir}"], lambda: shutil.rmtree(sync_dir, ignore_errors=True)),
+        # Index the recorded transcript first so the query has hits even when run alone
+        "search": (["exponential backoff"], lambda: main.fetch_transcript(main.extract_video_id(VIDEO_URL))),
+        "export": ([f"--output-dir={export_dir}"], lambda: shutil.rmtree(export_dir, ignore_errors=True)),
+        "cache": (["stats"], None),
+    }
+    return {
+        action: special.get(action, ([VIDEO_URL], None))
+        for action in main.COMMANDS
+        if action not in SKIPPED_ACTIONS
+    }
+
+
+def bench_actions(main: Any, workdir: Path, iterations: int, only: str | None) -> dict[str, Any]:
+    results = {}
+    for action, (args, setup) in action_cases(main, workdir).items():
+        for mode in ("cold", "warm"):
+            name = f"action:{action}:{mode}"
+            if only and only not in name:
+                continue
+            requires = ACTION_REQUIRES.get(action)
+            if requires and importlib.util.find_spec(requires) is None:
+                results[name] = {"skipped": f"{requires} not installed"}
+                continue
+            argv = [*args, "--no-cache"] if mode == "cold" else list(args)
+
+            def run() -> dict[str, Any]:
+                main.reset_memo()
+                stdout = io.StringIO()
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+                    exit_code = main.run_action(action, argv)
+                result = {"exit_code": exit_code, "output_bytes": len(stdout.getvalue().encode())}
+                if main.UPSTREAM.counters:
+                    result["upstream"] = main.UPSTREAM.stats()
+                return result
+
+            # Warm runs read what a first, untimed run put in the cache
+            if mode == "warm":
+                run()
+            timing, outcome = time_case(run, iterations, setup)
+            results[name] = {**timing, **outcome}
+    return results
+
+
+def synthetic_urls(count: int) -> list[str]:
+    rng = random.Random(42)
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+    shapes = [
+        "{id}",
+        "https://www.youtube.com/watch?v={id}",
+        "https://www.youtube.com/watch?v={id}&list=PLx&index=3",
+        "https://youtu.be/{id}?t=42",
+        "https://www.youtube.com/shorts/{id}",
+        "https://www.youtube.com/embed/{id}",
+    ]
+    return [
+        rng.choice(shapes).format(id="".join(rng.choice(alphabet) for _ in range(11)))
+        for _ in range(count)
+    ]
+
+
+def synthetic_description(chapters: int) -> str:
+    lines = []
+    for i in range(chapters):
+        seconds = i * 37
+        stamp = f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        lines.append(f"{stamp} - Chapter {i}")
+        lines.append(f"Some prose about chapter {i} with a link https://example.com/{i}")
+    return "\n".join(lines)
+
+
+def bench_helpers(main: Any, workdir: Path, iterations: int, only: str | None) -> dict[str, Any]:
+    urls = synthetic_urls(100_000)
+    description = synthetic_description(10_000)
+    snippets = standins.synthetic_snippets(max(standins.CONFIG.snippets, 50_000))
+    timed = main.TimedTranscript.from_snippets(snippets)
+    stored = workdir / "transcript.ptt"
+    chapters = [{"title": f"Chapter {i}", "start_time": i * 300} for i in range(40)]
+
+    threads = [
+        {"author": f"@author{i % 997}", "text": f"comment {i}", "likes": (i * 7919) % 1000,
+         "replies": [{"author": f"@author{i % 13}", "text": "reply", "likes": i % 50}] * 2}
+        for i in range(50_000)
+    ]
+
+    def rank_comments() -> int:
+        ranking = main.CommentRanking(top=20, aggregate="author")
+        for thread in threads:
+            ranking.add(thread)
+        return len(ranking.result()["authors"])
+
+    def store_roundtrip() -> int:
+        timed.save(stored)
+        return len(main.TimedTranscript.load(stored))
+
+    cases: dict[str, Callable[[], Any]] = {
+        "helper:extract_video_id": lambda: [main.extract_video_id(url) for url in urls],
+        "helper:parse_chapters_from_description": lambda: main.parse_chapters_from_description(description),
+        "helper:render_transcripts": lambda: main.render_transcripts(timed, list(main.TRANSCRIPT_FORMATS)),
+        "helper:chunk_transcript": lambda: main.chunk_transcript(timed, chapters),
+        "helper:align_chapters": lambda: main.align_chapters(timed, chapters),
+        "helper:comment_ranking": rank_comments,
+        "helper:timed_transcript_store": store_roundtrip,
+        "helper:minhash_signature": lambda: len(main.minhash(main.shingle_hashes(text for text, _, _ in timed))),
+    }
+    sizes = {
+        "helper:extract_video_id": len(urls),
+        "helper:parse_chapters_from_description": description.count("\n") + 1,
+        "helper:render_transcripts": len(snippets),
+        "helper:chunk_transcript": len(snippets),
+        "helper:align_chapters": len(snippets),
+        "helper:comment_ranking": len(threads),
+        "helper:timed_transcript_store": len(snippets),
+        "helper:minhash_signature": len(snippets),
+    }
+
+    results = {}
+    for name, run in cases.items():
+        if only and only not in name:
+            continue
+        timing, _ = time_case(run, iterations)
+        results[name] = {**timing, "input_size": sizes[name]}
+    return results
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Annotate results with the median change against a baseline report and print a table."""
+    sys.stderr.write(f"{'case':<44} {'baseline':>12} {'current':>12} {'change':>9}\n")
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("median_ms") or "median_ms" not in result:
+            continue
+        change = (result["median_ms"] - previous["median_ms"]) / previous["median_ms"] * 100
+        result["baseline_median_ms"] = previous["median_ms"]
+        result["change_pct"] = round(change, 1)
+        sys.stderr.write(
+            f"{name:<44} {previous['median_ms']:>10.2f}ms {result['median_ms']:>10.2f}ms {change:>+8.1f}%\n"
+        )
+
+
+def main() -> None:
+    options = parse_options(sys.argv[1:])
+    iterations = int(options.get("iterations", 5))
+    only = options.get("only")
+
+    standins.CONFIG.latency = float(options.get("latency", standins.CONFIG.latency))
+    standins.CONFIG.snippets = int(options.get("snippets", standins.CONFIG.snippets))
+    standins.CONFIG.comment_threads = int(options.get("comments", standins.CONFIG.comment_threads))
+    standins.CONFIG.failure_rate = float(options.get("failure-rate", standins.CONFIG.failure_rate))
+    standins.install()
+
+    with tempfile.TemporaryDirectory(prefix="youtube-bench-") as tmp:
+        workdir = Path(tmp)
+        # Keep caches, indexes, quota, events, and daemon sockets out of the real home directory
+        os.environ["HOME"] = str(workdir / "home")
+        for name in ISOLATED_ENV:
+            os.environ.pop(name, None)
+        os.environ["PAIS_OBSERVABILITY"] = "on" if "observability" in options else "off"
+        os.environ["YOUTUBE_API_KEY"] = "bench-key"
+        os.environ["PAIS_YOUTUBE_NO_DAEMON"] = "1"
+
+        sys.path.insert(0, str(PLUGIN_DIR / "src"))
+        import main as plugin
+
+        results = {}
+        results.update(bench_actions(plugin, workdir, iterations, only))
+        results.update(bench_helpers(plugin, workdir, iterations, only))
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "plugin_version": plugin_version(),
+        "python": platform.python_version(),
+        "config": asdict(standins.CONFIG),
+        "iterations": iterations,
+        "results": results,
+    }
+
+    if "compare" in options:
+        compare(report, json.loads(Path(options["compare"]).read_text()))
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if "output" in options:
+        Path(options["output"]).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
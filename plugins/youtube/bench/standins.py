@@ -0,0 +1,380 @@
+"""
+Offline stand-ins for the youtube plugin's upstream libraries.
+
+Installs fake `youtube_transcript_api`, `yt_dlp`, and `googleapiclient` modules
+into sys.modules. They replay the recorded responses in fixtures/recorded.json,
+scaled up to synthetic sizes, sleeping a configurable latency on every call that
+would have gone to the network.
+"""
+
+import copy
+import json
+import random
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+FIXTURES = Path(__file__).parent / "fixtures" / "recorded.json"
+
+
+@dataclass
+class StandinConfig:
+    """Knobs for the stand-ins; mutate the module-level CONFIG between runs."""
+    latency: float = 0.02
+    snippets: int = 2000
+    comment_threads: int = 500
+    replies_per_thread: int = 4
+    playlist_size: int = 25
+    failure_rate: float = 0.0
+
+
+CONFIG = StandinConfig()
+RECORDED: dict[str, Any] = json.loads(FIXTURES.read_text())
+
+_calls: dict[str, int] = {}
+_calls_lock = threading.Lock()
+_failures = random.Random(7)
+
+
+def upstream_call(name: str) -> None:
+    """Count one upstream call, pay its injected latency, and fail it at the injected rate."""
+    with _calls_lock:
+        _calls[name] = _calls.get(name, 0) + 1
+        failed = CONFIG.failure_rate and _failures.random() < CONFIG.failure_rate
+    if CONFIG.latency:
+        time.sleep(CONFIG.latency)
+    if failed:
+        raise transient_error(name)
+
+
+def take_calls() -> dict[str, int]:
+    """Return and reset the upstream call counters."""
+    with _calls_lock:
+        calls = dict(_calls)
+        _calls.clear()
+    return calls
+
+
+def synthetic_snippets(count: int) -> list[dict[str, Any]]:
+    """Repeat the recorded snippets, shifted in time, to the requested length."""
+    recorded = RECORDED["transcript"]["snippets"]
+    span = recorded[-1]["start"] + recorded[-1]["duration"]
+    snippets = []
+    for i in range(count):
+        entry = recorded[i % len(recorded)]
+        snippets.append({
+            "text": f"{entry['text']} ({i})",
+            "start": round(entry["start"] + span * (i // len(recorded)), 3),
+            "duration": entry["duration"],
+        })
+    return snippets
+
+
+# --- youtube_transcript_api ---------------------------------------------------
+
+class CouldNotRetrieveTranscript(Exception):
+    pass
+
+
+class NoTranscriptFound(CouldNotRetrieveTranscript):
+    pass
+
+
+class TranscriptsDisabled(CouldNotRetrieveTranscript):
+    pass
+
+
+class VideoUnavailable(CouldNotRetrieveTranscript):
+    pass
+
+
+class RequestBlocked(CouldNotRetrieveTranscript):
+    pass
+
+
+class IpBlocked(RequestBlocked):
+    pass
+
+
+class YouTubeRequestFailed(CouldNotRetrieveTranscript):
+    pass
+
+
+@dataclass
+class FetchedTranscriptSnippet:
+    text: str
+    start: float
+    duration: float
+
+
+class FetchedTranscript:
+    def __init__(self, video_id: str, language_code: str, is_generated: bool):
+        self.video_id = video_id
+        self.language_code = language_code
+        self.is_generated = is_generated
+        self.snippets = [FetchedTranscriptSnippet(**s) for s in synthetic_snippets(CONFIG.snippets)]
+
+
+class Transcript:
+    def __init__(self, video_id: str, language_code: str, is_generated: bool):
+        self.video_id = video_id
+        self.language_code = language_code
+        self.language = language_code
+        self.is_generated = is_generated
+        self.is_translatable = True
+        self.translation_languages = [
+            {"language": code, "language_code": code} for code in ("de", "es", "fr", "ja")
+        ]
+
+    def fetch(self, preserve_formatting: bool = False) -> FetchedTranscript:
+        upstream_call("transcript.fetch")
+        return FetchedTranscript(self.video_id, self.language_code, self.is_generated)
+
+    def translate(self, language_code: str) -> "Transcript":
+        return Transcript(self.video_id, language_code, self.is_generated)
+
+
+class TranscriptList:
+    def __init__(self, video_id: str):
+        self.video_id = video_id
+        self._transcripts = [
+            Transcript(video_id, "en", False),
+            Transcript(video_id, "es", False),
+            Transcript(video_id, "en", True),
+        ]
+
+    def __iter__(self):
+        return iter(self._transcripts)
+
+    def find_transcript(self, language_codes: list[str]) -> Transcript:
+        for code in language_codes:
+            for transcript in self._transcripts:
+                if transcript.language_code == code:
+                    return transcript
+        raise NoTranscriptFound(self.video_id)
+
+    def find_manually_created_transcript(self, language_codes: list[str]) -> Transcript:
+        for code in language_codes:
+            for transcript in self._transcripts:
+                if transcript.language_code == code and not transcript.is_generated:
+                    return transcript
+        raise NoTranscriptFound(self.video_id)
+
+    def find_generated_transcript(self, language_codes: list[str]) -> Transcript:
+        for code in language_codes:
+            for transcript in self._transcripts:
+                if transcript.language_code == code and transcript.is_generated:
+                    return transcript
+        raise NoTranscriptFound(self.video_id)
+
+
+class YouTubeTranscriptApi:
+    def list(self, video_id: str) -> TranscriptList:
+        upstream_call("transcript.list")
+        return TranscriptList(video_id)
+
+    def fetch(self, video_id: str, languages: tuple[str, ...] = ("en",)) -> FetchedTranscript:
+        return self.list(video_id).find_transcript(list(languages)).fetch()
+
+
+# --- yt_dlp ---------------------------------------------------------------------
+
+class DownloadError(Exception):
+    pass
+
+
+class YoutubeDL:
+    def __init__(self, params: dict[str, Any] | None = None):
+        self.params = params or {}
+
+    def __enter__(self) -> "YoutubeDL":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def extract_info(self, url: str, download: bool = True, process: bool = True, **kwargs: Any) -> dict:
+        upstream_call("ytdlp.extract_info")
+        if self.params.get("extract_flat"):
+            return self._listing(url)
+
+        video_id = url.rsplit("v=", 1)[-1][:11]
+        info = copy.deepcopy(RECORDED["info"])
+        info["id"] = video_id
+        if not process:
+            # Unprocessed results carry no format-derived fields
+            info.pop("duration_string", None)
+        else:
+            # Format resolution is the expensive part of a full extraction
+            upstream_call("ytdlp.formats")
+        return info
+
+    def _listing(self, url: str) -> dict[str, Any]:
+        def entries():
+            for i in range(CONFIG.playlist_size):
+                if i and i % 30 == 0:
+                    upstream_call("ytdlp.listing_page")
+                video_id = f"bench{i:06d}"
+                yield {"_type": "url", "id": video_id, "url": f"https://www.youtube.com/watch?v={video_id}"}
+
+        return {
+            "_type": "playlist",
+            "id": "UUbenchmarkchannel",
+            "title": RECORDED["info"]["channel"],
+            "channel": RECORDED["info"]["channel"],
+            "channel_id": RECORDED["info"]["channel_id"],
+            "entries": entries(),
+        }
+
+
+# --- googleapiclient ------------------------------------------------------------
+
+class HttpError(Exception):
+    def __init__(self, resp: Any, content: bytes, uri: str | None = None):
+        self.resp = resp
+        self.content = content
+        self.uri = uri
+        self.status_code = getattr(resp, "status", None)
+        self.error_details = []
+        super().__init__(f"<HttpError {self.status_code}>")
+
+
+class Request:
+    def __init__(self, name: str, respond: Any):
+        self.name = name
+        self.respond = respond
+        self.headers: dict[str, str] = {}
+
+    def execute(self, http: Any = None, num_retries: int = 0) -> dict[str, Any]:
+        upstream_call(self.name)
+        response = self.respond()
+        etag = self.headers.get("If-None-Match")
+        if etag and etag == response.get("etag"):
+            raise HttpError(types.SimpleNamespace(status=304, get=lambda key, default=None: default), b"")
+        return response
+
+
+def _thread(index: int) -> dict[str, Any]:
+    thread = copy.deepcopy(RECORDED["comment_thread"])
+    thread["id"] = f"thread{index:06d}"
+    top = thread["snippet"]["topLevelComment"]["snippet"]
+    top["likeCount"] = (index * 7919) % 1000
+    top["authorDisplayName"] = f"@author{index % 97}"
+    top["textDisplay"] = f"{top['textDisplay']} ({index})"
+    thread["snippet"]["totalReplyCount"] = CONFIG.replies_per_thread if index % 5 == 0 else 1
+    return thread
+
+
+class CommentThreads:
+    def list(self, **kwargs: Any) -> Request:
+        offset = int(kwargs.get("pageToken") or 0)
+        page_size = kwargs.get("maxResults", 20)
+
+        def respond() -> dict[str, Any]:
+            end = min(offset + page_size, CONFIG.comment_threads)
+            response: dict[str, Any] = {
+                "etag": f"threads-{offset}",
+                "items": [_thread(i) for i in range(offset, end)],
+            }
+            if end < CONFIG.comment_threads:
+                response["nextPageToken"] = str(end)
+            return response
+
+        return Request("data-api.commentThreads.list", respond)
+
+
+class Comments:
+    def list(self, **kwargs: Any) -> Request:
+        reply = RECORDED["comment_thread"]["replies"]["comments"][0]
+
+        def respond() -> dict[str, Any]:
+            return {"items": [copy.deepcopy(reply) for _ in range(CONFIG.replies_per_thread)]}
+
+        return Request("data-api.comments.list", respond)
+
+
+class Videos:
+    def list(self, **kwargs: Any) -> Request:
+        ids = [vid for vid in kwargs.get("id", "").split(",") if vid]
+
+        def respond() -> dict[str, Any]:
+            items = []
+            for video_id in ids:
+                item = copy.deepcopy(RECORDED["video_resource"])
+                item["id"] = video_id
+                items.append(item)
+            return {"etag": "videos-" + ",".join(ids), "items": items}
+
+        return Request("data-api.videos.list", respond)
+
+
+class YouTubeResource:
+    def commentThreads(self) -> CommentThreads:
+        return CommentThreads()
+
+    def comments(self) -> Comments:
+        return Comments()
+
+    def videos(self) -> Videos:
+        return Videos()
+
+
+def build(service: str, version: str, **kwargs: Any) -> YouTubeResource:
+    upstream_call("data-api.discovery")
+    return YouTubeResource()
+
+
+def build_from_document(document: Any, **kwargs: Any) -> YouTubeResource:
+    if isinstance(document, str):
+        json.loads(document)
+    return YouTubeResource()
+
+
+def get_static_doc(service_name: str, version: str) -> str:
+    # The bundled document is read from disk, not the network
+    return json.dumps({"name": service_name, "version": version, "rootUrl": "https://www.googleapis.com/"})
+
+
+def transient_error(name: str) -> Exception:
+    """The throttling error each backend raises, for injected failures."""
+    if name.startswith("transcript."):
+        return YouTubeRequestFailed("429 Too Many Requests")
+    if name.startswith("ytdlp."):
+        return DownloadError("ERROR: unable to download webpage: HTTP Error 503: Service Unavailable")
+    return HttpError(types.SimpleNamespace(status=503, get=lambda key, default=None: default), b"")
+
+
+# --- installation ---------------------------------------------------------------
+
+def _module(name: str, **attrs: Any) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install() -> None:
+    """Replace the upstream libraries in sys.modules with the stand-ins."""
+    errors = _module(
+        "youtube_transcript_api._errors",
+        CouldNotRetrieveTranscript=CouldNotRetrieveTranscript,
+        NoTranscriptFound=NoTranscriptFound,
+        TranscriptsDisabled=TranscriptsDisabled,
+        VideoUnavailable=VideoUnavailable,
+        RequestBlocked=RequestBlocked,
+        IpBlocked=IpBlocked,
+        YouTubeRequestFailed=YouTubeRequestFailed,
+    )
+    _module("youtube_transcript_api", YouTubeTranscriptApi=YouTubeTranscriptApi, _errors=errors)
+
+    utils = _module("yt_dlp.utils", DownloadError=DownloadError)
+    _module("yt_dlp", YoutubeDL=YoutubeDL, utils=utils, DownloadError=DownloadError)
+
+    discovery = _module("googleapiclient.discovery", build=build, build_from_document=build_from_document)
+    discovery_cache = _module("googleapiclient.discovery_cache", get_static_doc=get_static_doc)
+    api_errors = _module("googleapiclient.errors", HttpError=HttpError)
+    _module("googleapiclient", discovery=discovery, discovery_cache=discovery_cache, errors=api_errors)
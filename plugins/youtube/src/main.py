@@ -5,14 +5,1086 @@ YouTube extraction plugin for PAIS.
 Extracts transcripts, chapters, comments, and metadata from YouTube videos.
 """
 
+import array
+import bisect
+import contextlib
+import functools
+import hashlib
+import heapq
+import inspect
+import io
+import itertools
 import json
+import mmap
+import operator
 import os
+import random
 import re
+import socket
+import socketserver
+import sqlite3
+import struct
 import sys
+import threading
+import time
+import traceback
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
 
+# Per-invocation memo: identical fetches within one run share a single result
+_memo: dict[tuple, Future] = {}
+_memo_lock = threading.Lock()
+
+
+def coalesce(fn: Callable) -> Callable:
+    """Memoize fn for the current invocation, sharing in-flight calls across threads."""
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (fn.__name__, *bound.arguments.values())
+        with _memo_lock:
+            future = _memo.get(key)
+            owner = future is None
+            if owner:
+                future = _memo[key] = Future()
+
+        if owner:
+            try:
+                future.set_result(fn(*bound.args, **bound.kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        return future.result()
+
+    return wrapper
+
+
+def reset_memo(video_id: str | None = None) -> None:
+    """Drop memoized results, either all of them or only those for one video."""
+    with _memo_lock:
+        if video_id is None:
+            _memo.clear()
+            return
+        for key in [k for k in _memo if video_id in k[1:]]:
+            del _memo[key]
+
+
+# Default concurrency per upstream backend; batch runs may override these
+BACKEND_LIMITS = {
+    "ytdlp": 4,
+    "transcript": 4,
+    "data-api": 2,
+}
+_backend_slots: dict[str, threading.BoundedSemaphore] = {}
+_backend_lock = threading.Lock()
+
+
+def configure_backends(limits: dict[str, int]) -> None:
+    """Set per-backend concurrency limits; applies to slots not yet in use."""
+    with _backend_lock:
+        BACKEND_LIMITS.update(limits)
+        for name in limits:
+            _backend_slots.pop(name, None)
+
+
+def backend_slot(name: str) -> threading.BoundedSemaphore:
+    """Get the semaphore bounding concurrent calls to one upstream backend."""
+    with _backend_lock:
+        slot = _backend_slots.get(name)
+        if slot is None:
+            slot = _backend_slots[name] = threading.BoundedSemaphore(BACKEND_LIMITS.get(name, 1))
+        return slot
+
+
+_ydl_local = threading.local()
+
+
+def get_ydl(opts: dict[str, Any]) -> Any:
+    """Get this thread's YoutubeDL for these options, reused across extractions."""
+    import yt_dlp
+
+    instances = _ydl_local.__dict__.setdefault("instances", {})
+    key = json.dumps(opts, sort_keys=True)
+    ydl = instances.get(key)
+    if ydl is None:
+        ydl = instances[key] = yt_dlp.YoutubeDL(opts)
+    return ydl
+
+
+def get_observability_path() -> Path:
+    """Get the JSON-lines file the PAIS file sink collects events from."""
+    override = os.environ.get("PAIS_OBSERVABILITY_FILE")
+    if override:
+        return Path(override).expanduser()
+    return Path.home() / ".config" / "pais" / "history" / "observability" / "events.jsonl"
+
+
+class Tracer:
+    """Record per-stage timing spans to the observability sink and, with --timings, the output."""
+
+    def __init__(self):
+        self.action: str | None = None
+        self.collected: list[dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+        self._sink: io.TextIOBase | None = None
+        self.configure()
+
+    def configure(self) -> None:
+        """Read PAIS_OBSERVABILITY and the sink path from the environment."""
+        with self._lock:
+            self.enabled = os.environ.get("PAIS_OBSERVABILITY", "").lower() not in ("0", "off", "false")
+            if self._sink is not None and self._sink.name != str(get_observability_path()):
+                self._sink.close()
+                self._sink = None
+
+    @contextlib.contextmanager
+    def span(self, stage: str, video_id: str | None = None, **fields: Any) -> Iterator[dict[str, Any]]:
+        """Time the enclosed block; callers may add bytes, cache, or other fields to the yielded event."""
+        event: dict[str, Any] = {"stage": stage, "video_id": video_id, **fields}
+        start = time.perf_counter()
+        try:
+            yield event
+        except BaseException as e:
+            event["error"] = type(e).__name__
+            raise
+        finally:
+            event["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self.record(event)
+
+    def record(self, event: dict[str, Any]) -> None:
+        if not self.enabled and self.collected is None:
+            return
+        with self._lock:
+            if self.collected is not None:
+                self.collected.append(event)
+            if self.enabled:
+                self._write({
+                    "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "source": "youtube",
+                    "action": self.action,
+                    **event,
+                })
+
+    def _write(self, event: dict[str, Any]) -> None:
+        try:
+            if self._sink is None:
+                path = get_observability_path()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._sink = open(path, "a", encoding="utf-8")
+            self._sink.write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+            self._sink.flush()
+        except OSError:
+            # Telemetry must never fail the command it is observing
+            self.enabled = False
+
+
+TRACER = Tracer()
+
+
+# Attempts and backoff bounds (seconds) per upstream backend
+RETRY_POLICIES = {
+    "ytdlp": {"attempts": 3, "base": 1.0, "cap": 20.0},
+    "transcript": {"attempts": 4, "base": 0.5, "cap": 20.0},
+    "data-api": {"attempts": 5, "base": 1.0, "cap": 32.0},
+}
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 15.0
+BREAKER_MAX_COOLDOWN = 240.0
+
+# Exception class names, matched anywhere in the MRO, that mark a failure as transient
+TRANSIENT_ERRORS = {
+    "*": {
+        "TimeoutError", "ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout",
+        "RemoteDisconnected", "IncompleteRead", "ChunkedEncodingError",
+    },
+    "transcript": {"RequestBlocked", "YouTubeRequestFailed"},
+}
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+TRANSIENT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "backendError")
+YTDLP_TRANSIENT_PATTERN = re.compile(
+    r"HTTP Error (?:429|5\d\d)|timed out|Connection (?:reset|refused|aborted)|"
+    r"Temporary failure|Remote end closed",
+    re.IGNORECASE,
+)
+
+
+def is_transient(backend: str, error: BaseException) -> bool:
+    """Classify an upstream failure as worth retrying (throttling, 5xx, network) or permanent."""
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & (TRANSIENT_ERRORS["*"] | TRANSIENT_ERRORS.get(backend, set())):
+        return True
+    if backend == "data-api":
+        status = getattr(getattr(error, "resp", None), "status", None)
+        if status is None:
+            return False
+        if int(status) in TRANSIENT_STATUS:
+            return True
+        # 403 also carries quotaExceeded, which no retry today can fix
+        return int(status) == 403 and any(reason in str(error) for reason in TRANSIENT_REASONS)
+    if backend == "ytdlp":
+        return bool(YTDLP_TRANSIENT_PATTERN.search(str(error)))
+    return False
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Seconds the server asked us to wait, from an HTTP error's Retry-After header."""
+    headers = getattr(error, "resp", None)
+    try:
+        return float(headers.get("retry-after")) if hasattr(headers, "get") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Upstream:
+    """Run upstream calls in their backend slot, retrying transient failures with
+    full-jitter exponential backoff behind a per-backend circuit breaker.
+
+    BREAKER_THRESHOLD consecutive transient failures open a backend's breaker and
+    every caller pauses (outside its slot) until the cooldown ends. A failure right
+    after that reopens it with a doubled cooldown; any answer from the backend closes it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: dict[str, dict[str, float]] = {}
+        self._rng = random.Random()
+        self.counters: dict[str, dict[str, int]] = {}
+
+    def call(self, backend: str, fn: Callable[[], Any]) -> Any:
+        policy = RETRY_POLICIES[backend]
+        for attempt in range(1, policy["attempts"] + 1):
+            self._wait_closed(backend)
+            try:
+                with backend_slot(backend):
+                    result = fn()
+            except Exception as e:
+                if not is_transient(backend, e):
+                    self._answered(backend)
+                    raise
+                self._failed(backend)
+                if attempt == policy["attempts"]:
+                    self._count(backend, "gave_up")
+                    raise
+                delay = self._rng.uniform(0, min(policy["cap"], policy["base"] * 2 ** (attempt - 1)))
+                delay = max(delay, min(retry_after(e) or 0.0, BREAKER_MAX_COOLDOWN))
+                self._count(backend, "retries")
+                TRACER.record({
+                    "stage": "upstream.retry",
+                    "video_id": None,
+                    "backend": backend,
+                    "attempt": attempt,
+                    "error": type(e).__name__,
+                    "duration_ms": round(delay * 1000, 3),
+                })
+                time.sleep(delay)
+            else:
+                self._answered(backend)
+                return result
+
+    def _wait_closed(self, backend: str) -> None:
+        while True:
+            with self._lock:
+                breaker = self._breakers.get(backend)
+                wait = breaker["open_until"] - time.monotonic() if breaker else 0.0
+            if wait <= 0:
+                return
+            self._count(backend, "breaker_waits")
+            time.sleep(wait)
+
+    def _failed(self, backend: str) -> None:
+        with self._lock:
+            breaker = self._breakers.setdefault(
+                backend, {"failures": 0, "open_until": 0.0, "cooldown": BREAKER_COOLDOWN}
+            )
+            breaker["failures"] += 1
+            now = time.monotonic()
+            if breaker["failures"] >= BREAKER_THRESHOLD and breaker["open_until"] <= now:
+                if breaker["open_until"]:
+                    breaker["cooldown"] = min(breaker["cooldown"] * 2, BREAKER_MAX_COOLDOWN)
+                breaker["open_until"] = now + breaker["cooldown"]
+                counts = self.counters.setdefault(backend, {})
+                counts["breaker_opens"] = counts.get("breaker_opens", 0) + 1
+
+    def _answered(self, backend: str) -> None:
+        with self._lock:
+            self._breakers.pop(backend, None)
+
+    def _count(self, backend: str, counter: str) -> None:
+        with self._lock:
+            counts = self.counters.setdefault(backend, {})
+            counts[counter] = counts.get(counter, 0) + 1
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Retry and breaker counters since the last reset, with each breaker's state."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                backend: {
+                    **counts,
+                    "breaker": "open" if self._breakers.get(backend, {}).get("open_until", 0) > now else "closed",
+                }
+                for backend, counts in self.counters.items()
+            }
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.counters = {}
+
+
+UPSTREAM = Upstream()
+
+
+# Stored transcript layout: header, language, then the start, duration, and offset
+# columns and the UTF-8 text blob, each section 8-byte aligned, in native byte order
+TIMED_MAGIC = b"PAISTT01"
+TIMED_HEADER = struct.Struct("=8sQQQ")
+
+# Smaller stored transcripts are read into memory. A mapping keeps a duplicated file
+# descriptor open for the transcript's lifetime (before Python 3.13's trackfd=False),
+# so only bodies this large are mapped
+TIMED_MMAP_MIN_BYTES = 4 * 1024 * 1024
+TIMED_MMAP_OPTIONS = {"trackfd": False} if sys.version_info >= (3, 13) else {}
+
+
+class TimedTranscript:
+    """Columnar timed transcript: start and duration arrays plus one UTF-8 text blob with offsets.
+
+    Loaded transcripts are read in place (large ones memory-mapped); nothing is
+    built per snippet until a caller asks for it.
+    """
+
+    __slots__ = ("starts", "durations", "offsets", "blob", "language", "_mmap")
+
+    def __init__(
+        self,
+        starts: Any,
+        durations: Any,
+        offsets: Any,
+        blob: Any,
+        language: str | None = None,
+        _mmap: mmap.mmap | None = None,
+    ):
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets
+        self.blob = blob
+        self.language = language
+        self._mmap = _mmap
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, float, float]], language: str | None = None) -> "TimedTranscript":
+        starts, durations, offsets = array.array("d"), array.array("d"), array.array("Q", [0])
+        blob = bytearray()
+        for text, start, duration in rows:
+            blob += text.encode("utf-8")
+            starts.append(start)
+            durations.append(duration)
+            offsets.append(len(blob))
+        return cls(starts, durations, offsets, bytes(blob), language)
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable[dict], language: str | None = None) -> "TimedTranscript":
+        """Build from {"text", "start", "duration"} dicts."""
+        return cls.from_rows(((s["text"], s["start"], s.get("duration", 0)) for s in snippets), language)
+
+    @classmethod
+    def from_fetched(cls, fetched: Any, language: str | None = None) -> "TimedTranscript":
+        """Build from a youtube-transcript-api FetchedTranscript."""
+        return cls.from_rows(((s.text, s.start, s.duration) for s in fetched.snippets), language)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, i: int) -> str:
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[tuple[str, float, float]]:
+        """Yield (text, start, duration) per snippet."""
+        bounds = itertools.pairwise(self.offsets)
+        text = str(self.blob, "utf-8")
+        if len(text) == len(self.blob):
+            # All ASCII: byte offsets are character offsets, so slice one decoded string
+            texts = (text[a:b] for a, b in bounds)
+        else:
+            blob = self.blob
+            texts = (str(blob[a:b], "utf-8") for a, b in bounds)
+        return zip(texts, self.starts, self.durations)
+
+    @property
+    def text_bytes(self) -> int:
+        return len(self.blob)
+
+    def end(self) -> float:
+        return max((s + d for s, d in zip(self.starts, self.durations)), default=0.0)
+
+    def to_snippets(self) -> list[dict[str, Any]]:
+        return [{"text": text, "start": start, "duration": duration} for text, start, duration in self]
+
+    def save(self, path: Path) -> int:
+        """Write the transcript to a memory-mappable file; returns its size in bytes."""
+        language = (self.language or "").encode("utf-8")
+        sections = [
+            TIMED_HEADER.pack(TIMED_MAGIC, len(self), len(self.blob), len(language)),
+            language,
+            memoryview(self.starts).cast("B"),
+            memoryview(self.durations).cast("B"),
+            memoryview(self.offsets).cast("B"),
+            self.blob,
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        size = 0
+        with open(tmp, "wb") as f:
+            for section in sections:
+                f.write(section)
+                size += len(section)
+                if size % 8:
+                    f.write(b"\0" * (8 - size % 8))
+                    size += 8 - size % 8
+        tmp.replace(path)
+        return size
+
+    @classmethod
+    def load(cls, path: Path) -> "TimedTranscript":
+        """Load a saved transcript; columns are views over its bytes or, for large files, a mapping."""
+        mapped = None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= TIMED_MMAP_MIN_BYTES:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ, **TIMED_MMAP_OPTIONS)
+                view = memoryview(mapped)
+            else:
+                view = memoryview(f.read())
+        if len(view) < TIMED_HEADER.size:
+            raise ValueError(f"Truncated transcript file: {path}")
+        magic, count, blob_size, language_size = TIMED_HEADER.unpack_from(view)
+        if magic != TIMED_MAGIC:
+            raise ValueError(f"Not a stored transcript: {path}")
+
+        def aligned(n: int) -> int:
+            return (n + 7) & ~7
+
+        pos = aligned(TIMED_HEADER.size)
+        language = str(view[pos:pos + language_size], "utf-8") or None
+        pos += aligned(language_size)
+        starts = view[pos:pos + 8 * count].cast("d")
+        pos += 8 * count
+        durations = view[pos:pos + 8 * count].cast("d")
+        pos += 8 * count
+        offsets = view[pos:pos + 8 * (count + 1)].cast("Q")
+        pos += 8 * (count + 1)
+        blob = view[pos:pos + blob_size]
+        if len(blob) != blob_size:
+            raise ValueError(f"Truncated transcript file: {path}")
+        return cls(starts, durations, offsets, blob, language, mapped)
+
+
+def as_timed(snippets: Any, language: str | None = None) -> TimedTranscript:
+    """Accept a TimedTranscript or a list of snippet dicts (older cache entries, callers)."""
+    if isinstance(snippets, TimedTranscript):
+        return snippets
+    return TimedTranscript.from_snippets(snippets, language)
+
+
+# Persistent cache: per-kind time-to-live in seconds and total size cap
+CACHE_TTLS = {
+    "info": 7 * 24 * 3600,
+    "transcript": 90 * 24 * 3600,
+    # Comment pages are only served after the API confirms them with a 304
+    "comment-page": 30 * 24 * 3600,
+}
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def get_cache_dir() -> Path:
+    """Get cache directory for fetched metadata and transcripts (env PAIS_YOUTUBE_CACHE_DIR)."""
+    override = os.environ.get("PAIS_YOUTUBE_CACHE_DIR")
+    cache_dir = Path(override).expanduser() if override else Path.home() / ".cache" / "pais" / "youtube"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+class ResponseCache:
+    """Content-addressed SQLite store of compressed fetch results with TTL and LRU eviction.
+
+    A value's TimedTranscript "snippets" are kept beside the database as a
+    memory-mappable file and count toward the entry's size.
+    """
+
+    def __init__(self, path: Path | None = None, max_bytes: int | None = None):
+        self.path = path
+        if max_bytes is None:
+            max_mb = os.environ.get("PAIS_YOUTUBE_CACHE_MAX_MB")
+            max_bytes = int(max_mb) * 1024 * 1024 if max_mb else CACHE_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.path is None:
+                self.path = get_cache_dir() / "cache.db"
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    lang TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    etag TEXT
+                )
+            """)
+            if "etag" not in {row[1] for row in conn.execute("PRAGMA table_info(entries)")}:
+                conn.execute("ALTER TABLE entries ADD COLUMN etag TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_video ON entries (video_id)")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(kind: str, video_id: str, lang: str = "") -> str:
+        return hashlib.sha256(f"{kind}\0{video_id}\0{lang}".encode()).hexdigest()
+
+    def get(self, kind: str, video_id: str, lang: str = "") -> Any | None:
+        """Return the cached value, or None when missing, expired, or caching is off."""
+        if not self.enabled:
+            return None
+
+        with TRACER.span(f"cache.{kind}", video_id, cache="miss") as event:
+            key = self.make_key(kind, video_id, lang)
+            blob = self._read(key, kind)
+            if blob is None:
+                return None
+            try:
+                value = self._decode(key, blob)
+            except (FileNotFoundError, ValueError):
+                # The body file is gone or damaged; treat the entry as missing
+                with self._conn() as conn:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            event.update(cache="hit", bytes=len(blob))
+            return value
+
+    def body_path(self, key: str) -> Path:
+        if self.path is None:
+            self._conn()
+        return self.path.parent / "transcripts" / f"{key}.ptt"
+
+    def _decode(self, key: str, blob: bytes) -> Any:
+        value = json.loads(zlib.decompress(blob))
+        if isinstance(value, dict) and value.pop("body", False):
+            value["snippets"] = TimedTranscript.load(self.body_path(key))
+        return value
+
+    def _drop_bodies(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.body_path(key).unlink(missing_ok=True)
+
+    def _read(self, key: str, kind: str) -> bytes | None:
+        conn = self._conn()
+        row = conn.execute("SELECT data, created FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if now - row[1] > CACHE_TTLS.get(kind, 0):
+            with conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._drop_bodies([key])
+            return None
+
+        with conn:
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def lookup(self, kind: str, video_id: str, lang: str = "") -> tuple[Any, str | None] | None:
+        """Return a cached value and its ETag regardless of age, for conditional refresh."""
+        if not self.enabled:
+            return None
+        key = self.make_key(kind, video_id, lang)
+        row = self._conn().execute("SELECT data, etag FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return self._decode(key, row[0]), row[1]
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def touch(self, kind: str, video_id: str, lang: str = "", etag: str | None = None) -> None:
+        """Mark an entry fresh again after the upstream confirmed it (or record its first ETag)."""
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE entries SET created = ?, accessed = ?, etag = COALESCE(?, etag) WHERE key = ?",
+                (now, now, etag, self.make_key(kind, video_id, lang)),
+            )
+
+    def video_ids(self, kind: str) -> list[str]:
+        """Every video with at least one entry of this kind, expired or not."""
+        rows = self._conn().execute("SELECT DISTINCT video_id FROM entries WHERE kind = ?", (kind,))
+        return [row[0] for row in rows]
+
+    def put(self, kind: str, video_id: str, value: Any, lang: str = "", etag: str | None = None) -> None:
+        """Store a value (with the upstream ETag, if any) and evict least recently used entries beyond the size cap."""
+        if not self.enabled:
+            return
+
+        key = self.make_key(kind, video_id, lang)
+        body_size = 0
+        if isinstance(value, dict) and isinstance(value.get("snippets"), TimedTranscript):
+            body_size = value["snippets"].save(self.body_path(key))
+            value = {**value, "snippets": None, "body": True}
+
+        data = zlib.compress(json.dumps(value).encode(), 6)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, kind, video_id, lang, data, size, created, accessed, etag) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, video_id, lang, data, len(data) + body_size, now, now, etag),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", ((key,) for key in doomed))
+        self._drop_bodies(doomed)
+
+    def purge(self, video_id: str | None = None, kind: str | None = None, expired: bool = False) -> int:
+        """Delete matching entries and return how many were removed."""
+        clauses, params = [], []
+        if expired:
+            now = time.time()
+            clauses.append(
+                "(" + " OR ".join("(kind = ? AND created < ?)" for _ in CACHE_TTLS) + ")"
+            )
+            for k, ttl in CACHE_TTLS.items():
+                params.extend((k, now - ttl))
+        else:
+            if video_id:
+                clauses.append("video_id = ?")
+                params.append(video_id)
+            if kind:
+                clauses.append("kind = ?")
+                params.append(kind)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._conn()
+        with conn:
+            keys = [row[0] for row in conn.execute(f"SELECT key FROM entries{where}", params)]
+            conn.execute(f"DELETE FROM entries{where}", params)
+        self._drop_bodies(keys)
+        return len(keys)
+
+    def iter_kind(self, kind: str, strict: bool = False) -> Iterator[tuple[str, str, Any]]:
+        """Yield (video_id, lang, value) for every live entry of one kind.
+
+        Damaged entries are skipped, or raise their error with strict set.
+        """
+        cutoff = time.time() - CACHE_TTLS.get(kind, 0)
+        rows = self._conn().execute(
+            "SELECT key, video_id, lang, data FROM entries WHERE kind = ? AND created >= ?", (kind, cutoff)
+        ).fetchall()
+        for key, video_id, lang, data in rows:
+            try:
+                value = self._decode(key, data)
+            except (FileNotFoundError, ValueError) as e:
+                if strict:
+                    raise ValueError(f"Cannot read cached {kind} for {video_id}: {e}") from e
+                continue
+            yield video_id, lang, value
+
+    def stats(self) -> dict[str, Any]:
+        """Summarize entry counts and sizes per kind."""
+        conn = self._conn()
+        kinds = {
+            kind: {"entries": count, "bytes": size}
+            for kind, count, size in conn.execute(
+                "SELECT kind, COUNT(*), SUM(size) FROM entries GROUP BY kind"
+            )
+        }
+        return {
+            "path": str(self.path),
+            "max_bytes": self.max_bytes,
+            "total_bytes": sum(k["bytes"] for k in kinds.values()),
+            "entries": sum(k["entries"] for k in kinds.values()),
+            "kinds": kinds,
+            "ttls": CACHE_TTLS,
+        }
+
+
+CACHE = ResponseCache()
+
+
+class TranscriptIndex:
+    """SQLite FTS5 index over timed transcript snippets, built as transcripts are fetched."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.path is None:
+                self.path = get_cache_dir() / "search.db"
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    language TEXT,
+                    snippet_count INTEGER NOT NULL,
+                    indexed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS snippets USING fts5(
+                    text, video_id UNINDEXED, start UNINDEXED, tokenize = 'porter unicode61'
+                )
+            """)
+            self._local.conn = conn
+        return conn
+
+    def add(self, video_id: str, snippets: Any, language: str | None = None) -> bool:
+        """Index a video's snippets unless it is already indexed; returns True if added."""
+        transcript = as_timed(snippets)
+        conn = self._conn()
+        with conn:
+            if conn.execute("SELECT 1 FROM videos WHERE video_id = ?", (video_id,)).fetchone():
+                return False
+            conn.execute(
+                "INSERT INTO videos (video_id, language, snippet_count, indexed_at) VALUES (?, ?, ?, ?)",
+                (video_id, language, len(transcript), time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO snippets (text, video_id, start) VALUES (?, ?, ?)",
+                ((text, video_id, start) for text, start, _ in transcript),
+            )
+        return True
+
+    def set_title(self, video_id: str, title: str | None) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE videos SET title = ? WHERE video_id = ?", (title, video_id))
+
+    def search(self, query: str, limit: int = 20, video_id: str | None = None) -> list[dict[str, Any]]:
+        """Return the best-ranked snippets matching an FTS5 query."""
+        sql = """
+            SELECT s.video_id, v.title, s.text, s.start, bm25(snippets) AS score
+            FROM snippets s JOIN videos v ON v.video_id = s.video_id
+            WHERE snippets MATCH ?{}
+            ORDER BY score LIMIT ?
+        """.format(" AND s.video_id = ?" if video_id else "")
+        conn = self._conn()
+
+        def run(match: str) -> list[tuple]:
+            params = [match, *([video_id] if video_id else []), limit]
+            return conn.execute(sql, params).fetchall()
+
+        try:
+            rows = run(query)
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax: search for the words as plain terms
+            rows = run(" ".join('"{}"'.format(word.replace('"', '""')) for word in query.split()))
+
+        hits = []
+        for vid, title, text, start, score in rows:
+            if title is None:
+                cached = CACHE.get("info", vid)
+                title = cached.get("title") if cached else None
+            hits.append({
+                "video_id": vid,
+                "title": title,
+                "text": text,
+                "start": start,
+                "start_formatted": format_time_simple(start),
+                "url": f"https://www.youtube.com/watch?v={vid}&t={int(start)}s",
+                "score": round(-score, 4),
+            })
+        return hits
+
+    def stats(self) -> dict[str, Any]:
+        conn = self._conn()
+        videos, snippets = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(snippet_count), 0) FROM videos"
+        ).fetchone()
+        return {"path": str(self.path), "videos": videos, "snippets": snippets}
+
+
+INDEX = TranscriptIndex()
+
+
+# Near-duplicate detection: MinHash signatures over word shingles, banded for LSH.
+# 16 bands of 8 rows make pairs above a Jaccard similarity of about 0.7 likely
+# candidates; candidates are then verified against the signatures.
+SHINGLE_WORDS = 5
+MINHASH_SLOTS = 128
+LSH_BANDS = 16
+DEDUPE_THRESHOLD = 0.8
+WORD_PATTERN = re.compile(r"\w+")
+_EMPTY_SLOT = (1 << 64) - 1
+
+
+def shingle_hashes(texts: Iterable[str]) -> set[int]:
+    """64-bit hashes of the overlapping word n-grams of a transcript's text."""
+    words = [word for text in texts for word in WORD_PATTERN.findall(text.lower())]
+    return {
+        int.from_bytes(
+            hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode(), digest_size=8).digest(), "little"
+        )
+        for i in range(max(len(words) - SHINGLE_WORDS + 1, 1) if words else 0)
+    }
+
+
+def minhash(hashes: set[int]) -> array.array:
+    """One-permutation MinHash: each shingle hash is binned once, keeping each bin's minimum.
+
+    Empty bins borrow the value of the next filled bin, offset by the distance, so
+    all slots stay comparable between signatures (rotation densification).
+    """
+    slots = [_EMPTY_SLOT] * MINHASH_SLOTS
+    for value in hashes:
+        index, rest = value % MINHASH_SLOTS, value // MINHASH_SLOTS
+        if rest < slots[index]:
+            slots[index] = rest
+
+    filled = [slot for slot in slots if slot != _EMPTY_SLOT]
+    if filled and len(filled) < MINHASH_SLOTS:
+        source = list(slots)
+        for i in range(MINHASH_SLOTS):
+            if source[i] != _EMPTY_SLOT:
+                continue
+            for distance in range(1, MINHASH_SLOTS):
+                borrowed = source[(i + distance) % MINHASH_SLOTS]
+                if borrowed != _EMPTY_SLOT:
+                    # Bin values are below 2**57, so the offset stays within 64 bits
+                    slots[i] = borrowed + (distance << 57)
+                    break
+    return array.array("Q", slots)
+
+
+def signature_similarity(a: array.array, b: array.array) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(map(operator.eq, a, b)) / MINHASH_SLOTS
+
+
+def band_keys(signature: array.array) -> list[int]:
+    """One bucket key per LSH band, as signed 64-bit integers for SQLite."""
+    rows = MINHASH_SLOTS // LSH_BANDS
+    return [
+        int.from_bytes(
+            hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+class DuplicateIndex:
+    """SQLite LSH index of transcript MinHash signatures for near-duplicate lookups.
+
+    A lookup reads only the videos sharing a band bucket with the query, so its
+    cost follows the number of near matches rather than the size of the corpus.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.path is None:
+                self.path = get_cache_dir() / "dedupe.db"
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS signatures (
+                    video_id TEXT PRIMARY KEY,
+                    language TEXT,
+                    shingles INTEGER NOT NULL,
+                    signature BLOB NOT NULL,
+                    added_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    video_id TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, video_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS bands_video ON bands (video_id)")
+            self._local.conn = conn
+        return conn
+
+    def add(self, video_id: str, snippets: Any, language: str | None = None) -> bool:
+        """Sign and bucket a transcript unless the video is already indexed; returns True if added."""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM signatures WHERE video_id = ?", (video_id,)).fetchone():
+            return False
+        hashes = shingle_hashes(text for text, _, _ in as_timed(snippets))
+        if not hashes:
+            return False
+        signature = minhash(hashes)
+        with conn:
+            # Insertion order decides which copy counts as the original
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO signatures (video_id, language, shingles, signature, added_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_id, language, len(hashes), signature.tobytes(), time.time()),
+            )
+            if not cursor.rowcount:
+                return False
+            conn.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, video_id) VALUES (?, ?, ?)",
+                ((band, key, video_id) for band, key in enumerate(band_keys(signature))),
+            )
+        return True
+
+    def _signatures(self, video_ids: Iterable[str]) -> dict[str, array.array]:
+        conn = self._conn()
+        signatures = {}
+        for video_id in video_ids:
+            row = conn.execute("SELECT signature FROM signatures WHERE video_id = ?", (video_id,)).fetchone()
+            if row:
+                signatures[video_id] = array.array("Q", row[0])
+        return signatures
+
+    def similar(self, video_id: str, threshold: float = DEDUPE_THRESHOLD, earlier_only: bool = False) -> list[dict[str, Any]]:
+        """Indexed videos whose estimated similarity to this one reaches threshold, closest first.
+
+        With earlier_only, only videos indexed before this one are considered.
+        """
+        own = self._signatures([video_id]).get(video_id)
+        if own is None:
+            return []
+        sql = """
+            SELECT DISTINCT other.video_id FROM bands mine
+            JOIN bands other ON other.band = mine.band AND other.bucket = mine.bucket
+            WHERE mine.video_id = ? AND other.video_id != ?
+        """
+        params: list[Any] = [video_id, video_id]
+        if earlier_only:
+            sql += """ AND (SELECT rowid FROM signatures WHERE video_id = other.video_id)
+                       < (SELECT rowid FROM signatures WHERE video_id = ?)"""
+            params.append(video_id)
+        candidates = [row[0] for row in self._conn().execute(sql, params)]
+
+        matches = []
+        for other, signature in self._signatures(candidates).items():
+            similarity = signature_similarity(own, signature)
+            if similarity >= threshold:
+                matches.append({"video_id": other, "similarity": round(similarity, 3)})
+        matches.sort(key=lambda m: (-m["similarity"], m["video_id"]))
+        return matches
+
+    def clusters(self, threshold: float = DEDUPE_THRESHOLD) -> list[dict[str, Any]]:
+        """Group every indexed video with its near duplicates; the first indexed copy is the original."""
+        conn = self._conn()
+        pairs = conn.execute("""
+            SELECT DISTINCT a.video_id, b.video_id FROM bands a
+            JOIN bands b ON b.band = a.band AND b.bucket = a.bucket AND b.video_id > a.video_id
+        """).fetchall()
+        signatures = self._signatures({vid for pair in pairs for vid in pair})
+
+        parent: dict[str, str] = {}
+
+        def root(vid: str) -> str:
+            while parent.setdefault(vid, vid) != vid:
+                parent[vid] = parent[parent[vid]]
+                vid = parent[vid]
+            return vid
+
+        for a, b in pairs:
+            if signature_similarity(signatures[a], signatures[b]) >= threshold:
+                parent[root(a)] = root(b)
+
+        groups: dict[str, list[str]] = {}
+        for vid in list(parent):
+            groups.setdefault(root(vid), []).append(vid)
+
+        order = dict(conn.execute("SELECT video_id, rowid FROM signatures"))
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            original, *copies = sorted(members, key=order.__getitem__)
+            clusters.append({
+                "original": original,
+                "duplicates": [
+                    {
+                        "video_id": vid,
+                        "similarity": round(signature_similarity(signatures[original], signatures[vid]), 3),
+                    }
+                    for vid in copies
+                ],
+            })
+        clusters.sort(key=lambda c: order[c["original"]])
+        return clusters
+
+    def stats(self) -> dict[str, Any]:
+        videos = self._conn().execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+        return {"path": str(self.path), "videos": videos}
+
+
+DEDUPE = DuplicateIndex()
+
+
+def check_duplicate(video_id: str, threshold: float = DEDUPE_THRESHOLD) -> dict[str, Any] | None:
+    """Return the closest near-duplicate of this video's transcript indexed before it, if any."""
+    fetched = fetch_transcript(video_id)
+    if not fetched["success"]:
+        return None
+    try:
+        DEDUPE.add(video_id, fetched["snippets"], fetched.get("language"))
+        matches = DEDUPE.similar(video_id, threshold, earlier_only=True)
+    except sqlite3.Error:
+        return None
+    return matches[0] if matches else None
+
+
+def index_transcript(video_id: str, snippets: Any, language: str | None = None) -> bool:
+    """Add a fetched transcript to the search and duplicate indexes; indexing never fails a fetch."""
+    try:
+        DEDUPE.add(video_id, snippets, language)
+        if not INDEX.add(video_id, snippets, language):
+            return False
+        cached = CACHE.get("info", video_id)
+        if cached:
+            INDEX.set_title(video_id, cached.get("title"))
+        return True
+    except sqlite3.Error:
+        return False
+
+
 def extract_video_id(url_or_id: str) -> str:
     """Extract video ID from URL or return as-is if already an ID."""
     if len(url_or_id) == 11 and re.match(r"^[\w-]+$", url_or_id):
@@ -31,8 +1103,22 @@ def extract_video_id(url_or_id: str) -> str:
     raise ValueError(f"Could not extract video ID from: {url_or_id}")
 
 
+# Resolved credentials, kept for the life of the process once found
+_credentials: dict[str, str] = {}
+
+
 def get_youtube_api_key() -> str | None:
     """Get YouTube API key from environment or fabric config."""
+    api_key = _credentials.get("youtube")
+    if api_key is None:
+        api_key = read_youtube_api_key()
+        if api_key:
+            _credentials["youtube"] = api_key
+    return api_key
+
+
+def read_youtube_api_key() -> str | None:
+    """Look the YouTube API key up in the environment and .env files."""
     # Check environment first
     api_key = os.environ.get("YOUTUBE_API_KEY")
     if api_key:
@@ -57,8 +1143,14 @@ def get_youtube_api_key() -> str | None:
     return None
 
 
-def get_transcript(video_id: str, fmt: str = "text") -> dict[str, Any]:
-    """Fetch transcript using youtube-transcript-api."""
+@coalesce
+def fetch_transcript(video_id: str) -> dict[str, Any]:
+    """Fetch timed transcript snippets once; every output format is rendered from these."""
+    cached = CACHE.get("transcript", video_id, "auto")
+    if cached is not None:
+        cached["snippets"] = as_timed(cached["snippets"], cached.get("language"))
+        return {"success": True, **cached}
+
     try:
         from youtube_transcript_api import YouTubeTranscriptApi
         from youtube_transcript_api._errors import (
@@ -74,59 +1166,230 @@ def get_transcript(video_id: str, fmt: str = "text") -> dict[str, Any]:
 
     try:
         ytt_api = YouTubeTranscriptApi()
-        transcript_list = ytt_api.list(video_id)
+        with TRACER.span("transcript.list", video_id):
+            transcript_list = UPSTREAM.call("transcript", lambda: ytt_api.list(video_id))
 
         # Try to get manually created transcript first, then auto-generated
-        transcript = None
-        for t in transcript_list:
-            if not t.is_generated:
-                transcript = t.fetch()
-                break
+        with TRACER.span("transcript.fetch", video_id) as event:
+            track = next((t for t in transcript_list if not t.is_generated), None)
+            if track is None:
+                track = transcript_list.find_generated_transcript(["en"])
+            transcript = UPSTREAM.call("transcript", track.fetch)
+            language = getattr(transcript, "language_code", None)
+            snippets = TimedTranscript.from_fetched(transcript, language)
+            event["bytes"] = snippets.text_bytes
+
+        fetched = {"language": language, "snippets": snippets}
+        CACHE.put("transcript", video_id, fetched, "auto")
+        index_transcript(video_id, snippets, fetched["language"])
+        return {"success": True, **fetched}
+
+    except VideoUnavailable:
+        return {"success": False, "error": f"Video unavailable: {video_id}", "permanent": True}
+    except TranscriptsDisabled:
+        return {"success": False, "error": f"Transcripts disabled for video: {video_id}", "permanent": True}
+    except NoTranscriptFound:
+        return {"success": False, "error": f"No transcript found for video: {video_id}", "permanent": True}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
-        if transcript is None:
-            transcript = transcript_list.find_generated_transcript(["en"]).fetch()
 
-        # Convert FetchedTranscript to list of dicts for consistent handling
-        snippets = [
-            {"text": s.text, "start": s.start, "duration": s.duration}
-            for s in transcript.snippets
-        ]
+def find_track(transcript_list: Any, language: str) -> tuple[Any, str | None]:
+    """Pick the track for one language code: a native track, else a translation of one.
+
+    Returns the transcript and, for a translation, the language it was translated from.
+    """
+    from youtube_transcript_api._errors import NoTranscriptFound
 
+    try:
+        return transcript_list.find_transcript([language]), None
+    except NoTranscriptFound:
+        pass
+
+    # Prefer translating a manually created track over a generated one
+    sources = sorted(
+        (t for t in transcript_list if getattr(t, "is_translatable", False)),
+        key=lambda t: t.is_generated,
+    )
+    for source in sources:
+        if any(lang["language_code"] == language for lang in source.translation_languages):
+            return source.translate(language), source.language_code
+    raise NoTranscriptFound(transcript_list.video_id, [language], transcript_list)
+
+
+@coalesce
+def fetch_transcripts(video_id: str, languages: tuple[str, ...]) -> dict[str, Any]:
+    """Fetch several languages of one transcript concurrently from a single list() call.
+
+    Codes without a native track are translated from one. Returns the tracks keyed
+    by language code, plus per-language errors.
+    """
+    tracks: dict[str, Any] = {}
+    for language in languages:
+        cached = CACHE.get("transcript", video_id, language)
+        if cached is not None:
+            cached["snippets"] = as_timed(cached["snippets"], language)
+            tracks[language] = cached
+    missing = [language for language in languages if language not in tracks]
+    errors: dict[str, str] = {}
+
+    if missing:
+        try:
+            from youtube_transcript_api import YouTubeTranscriptApi
+            from youtube_transcript_api._errors import (
+                NoTranscriptFound,
+                TranscriptsDisabled,
+                VideoUnavailable,
+            )
+        except ImportError:
+            return {
+                "success": False,
+                "error": "youtube-transcript-api not installed. Run: uv pip install youtube-transcript-api",
+            }
+
+        try:
+            with TRACER.span("transcript.list", video_id):
+                transcript_list = UPSTREAM.call("transcript", lambda: YouTubeTranscriptApi().list(video_id))
+        except VideoUnavailable:
+            return {"success": False, "error": f"Video unavailable: {video_id}"}
+        except TranscriptsDisabled:
+            return {"success": False, "error": f"Transcripts disabled for video: {video_id}"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        def fetch_one(language: str) -> dict[str, Any]:
+            transcript, source_language = find_track(transcript_list, language)
+            with TRACER.span("transcript.fetch", video_id, language=language) as event:
+                snippets = TimedTranscript.from_fetched(UPSTREAM.call("transcript", transcript.fetch), language)
+                event["bytes"] = snippets.text_bytes
+            return {
+                "language": language,
+                "translated": source_language is not None,
+                "source_language": source_language or language,
+                "snippets": snippets,
+            }
+
+        with ThreadPoolExecutor(max_workers=min(len(missing), BACKEND_LIMITS["transcript"])) as pool:
+            futures = {pool.submit(fetch_one, language): language for language in missing}
+            for future in as_completed(futures):
+                language = futures[future]
+                try:
+                    track = tracks[language] = future.result()
+                except NoTranscriptFound:
+                    errors[language] = f"No transcript or translation for language: {language}"
+                    continue
+                except Exception as e:
+                    errors[language] = str(e)
+                    continue
+                CACHE.put("transcript", video_id, track, language)
+                if not track["translated"]:
+                    index_transcript(video_id, track["snippets"], language)
+
+    if not tracks:
+        return {"success": False, "error": "; ".join(errors.values()), "errors": errors}
+
+    result = {
+        "success": True,
+        "transcripts": {language: tracks[language] for language in languages if language in tracks},
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+# Renderable transcript formats and the file extension each is written with
+TRANSCRIPT_FORMATS = {
+    "text": "txt",
+    "json": "json",
+    "srt": "srt",
+    "vtt": "vtt",
+    "paragraphs": "md",
+}
+
+# Paragraphs break on a pause this long, or once they span this many seconds
+PARAGRAPH_PAUSE = 2.0
+PARAGRAPH_SPAN = 60.0
+
+
+def render_transcripts(snippets: Any, formats: Iterable[str]) -> dict[str, Any]:
+    """Render a timed transcript into every requested format in a single pass."""
+    formats = list(dict.fromkeys(formats))
+    unknown = [fmt for fmt in formats if fmt not in TRANSCRIPT_FORMATS]
+    if unknown:
+        raise ValueError(
+            f"Unknown transcript format: {', '.join(unknown)} (available: {', '.join(TRANSCRIPT_FORMATS)})"
+        )
+
+    parts: dict[str, list[str]] = {fmt: [] for fmt in formats if fmt != "json"}
+    paragraph: list[str] = []
+    paragraph_start = 0.0
+    previous_end = 0.0
+
+    for i, (text, start, duration) in enumerate(as_timed(snippets), 1):
+        end = start + duration
+
+        if "text" in parts:
+            parts["text"].append(text)
+        if "srt" in parts:
+            parts["srt"].append(f"{i}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n")
+        if "vtt" in parts:
+            parts["vtt"].append(f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{text}\n")
+        if "paragraphs" in parts:
+            if paragraph and (start - previous_end >= PARAGRAPH_PAUSE or start - paragraph_start >= PARAGRAPH_SPAN):
+                parts["paragraphs"].append(" ".join(paragraph))
+                paragraph = []
+            if not paragraph:
+                paragraph_start = start
+            paragraph.append(text)
+            previous_end = end
+
+    if paragraph:
+        parts["paragraphs"].append(" ".join(paragraph))
+
+    rendered: dict[str, Any] = {}
+    for fmt in formats:
         if fmt == "json":
-            return {"success": True, "transcript": snippets}
-        elif fmt == "srt":
-            lines = []
-            for i, entry in enumerate(snippets, 1):
-                start = entry["start"]
-                duration = entry.get("duration", 0)
-                end = start + duration
-                lines.append(str(i))
-                lines.append(f"{format_timestamp(start)} --> {format_timestamp(end)}")
-                lines.append(entry["text"])
-                lines.append("")
-            return {"success": True, "transcript": "\n".join(lines)}
+            rendered[fmt] = as_timed(snippets).to_snippets()
+        elif fmt == "text":
+            rendered[fmt] = " ".join(parts[fmt])
+        elif fmt == "vtt":
+            rendered[fmt] = "\n".join(["WEBVTT\n", *parts[fmt]])
+        elif fmt == "paragraphs":
+            rendered[fmt] = "\n\n".join(parts[fmt])
         else:
-            # Plain text
-            text = " ".join(entry["text"] for entry in snippets)
-            return {"success": True, "transcript": text}
+            rendered[fmt] = "\n".join(parts[fmt])
+    return rendered
 
-    except VideoUnavailable:
-        return {"success": False, "error": f"Video unavailable: {video_id}"}
-    except TranscriptsDisabled:
-        return {"success": False, "error": f"Transcripts disabled for video: {video_id}"}
-    except NoTranscriptFound:
-        return {"success": False, "error": f"No transcript found for video: {video_id}"}
-    except Exception as e:
+
+def get_transcript(video_id: str, fmt: str = "text") -> dict[str, Any]:
+    """Get transcript in the requested format (text, json, srt, vtt, paragraphs)."""
+    fetched = fetch_transcript(video_id)
+    if not fetched["success"]:
+        return fetched
+    try:
+        return {"success": True, "transcript": render_transcripts(fetched["snippets"], [fmt])[fmt]}
+    except ValueError as e:
         return {"success": False, "error": str(e)}
 
 
-def format_timestamp(seconds: float) -> str:
-    """Format seconds as SRT timestamp."""
+def get_output_dir(base_dir: str | None = None) -> Path:
+    """Get output directory for files written by the plugin."""
+    if base_dir:
+        output_dir = Path(base_dir).expanduser()
+    else:
+        output_dir = Path.home() / ".config" / "pais" / "research" / "youtube"
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """Format seconds as SRT timestamp (or WebVTT with a "." separator)."""
     hours = int(seconds // 3600)
     minutes = int((seconds % 3600) // 60)
     secs = int(seconds % 60)
     millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
 
 
 def format_time_simple(seconds: float) -> str:
@@ -139,48 +1402,204 @@ def format_time_simple(seconds: float) -> str:
     return f"{minutes}:{secs:02d}"
 
 
-def get_video_info(video_id: str) -> dict[str, Any]:
-    """Get video metadata using yt-dlp."""
+# Metadata-only extraction: skip the player JS (signature/nsig decoding) and
+# DASH/HLS manifests, and return the raw result without format processing
+METADATA_YDL_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "extractor_args": {
+        "youtube": {
+            "player_skip": ["js"],
+            "skip": ["dash", "hls", "translated_subs"],
+        },
+    },
+}
+
+FULL_YDL_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "extract_flat": False,
+}
+
+
+def extract_metadata(video_id: str, full: bool = False) -> dict[str, Any]:
+    """Run yt-dlp extraction, using the metadata-only fast path unless full is set."""
+    url = f"https://www.youtube.com/watch?v={video_id}"
+
+    if not full:
+        try:
+            with TRACER.span("ytdlp.metadata", video_id):
+                info = UPSTREAM.call(
+                    "ytdlp", lambda: get_ydl(METADATA_YDL_OPTS).extract_info(url, download=False, process=False)
+                )
+            if info and info.get("title"):
+                return info
+        except Exception as e:
+            # Retries are already spent on a throttled backend; the full path would only hammer it again
+            if is_transient("ytdlp", e):
+                raise
+
+    # Full extraction resolves every format; kept as the fallback
+    with TRACER.span("ytdlp.full", video_id):
+        return UPSTREAM.call("ytdlp", lambda: get_ydl(FULL_YDL_OPTS).extract_info(url, download=False))
+
+
+@coalesce
+def get_video_info(video_id: str, full: bool = False) -> dict[str, Any]:
+    """Get video metadata using yt-dlp; full extractions are cached apart from fast-path ones."""
+    variant = "full" if full else ""
+    cached = CACHE.get("info", video_id, variant)
+    if cached is not None:
+        return {"success": True, "info": cached}
+
     try:
-        import yt_dlp
+        import yt_dlp  # noqa: F401
     except ImportError:
         return {
             "success": False,
             "error": "yt-dlp not installed. Run: uv pip install yt-dlp",
         }
 
-    ydl_opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "extract_flat": False,
-    }
-
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+        info = extract_metadata(video_id, full)
+        duration = info.get("duration")
 
-            return {
-                "success": True,
-                "info": {
-                    "id": info.get("id"),
-                    "title": info.get("title"),
-                    "channel": info.get("channel"),
-                    "channel_id": info.get("channel_id"),
-                    "duration": info.get("duration"),
-                    "duration_string": info.get("duration_string"),
-                    "view_count": info.get("view_count"),
-                    "upload_date": info.get("upload_date"),
-                    "description": info.get("description"),
-                    "tags": info.get("tags", []),
-                    "categories": info.get("categories", []),
-                    "chapters": info.get("chapters", []),
-                    "url": f"https://www.youtube.com/watch?v={video_id}",
-                },
-            }
+        result = {
+            "id": info.get("id"),
+            "title": info.get("title"),
+            "channel": info.get("channel"),
+            "channel_id": info.get("channel_id"),
+            "duration": duration,
+            # Only filled in by format processing, which the fast path skips
+            "duration_string": info.get("duration_string") or (
+                format_time_simple(duration) if duration is not None else None
+            ),
+            "view_count": info.get("view_count"),
+            "upload_date": info.get("upload_date"),
+            "description": info.get("description"),
+            "tags": info.get("tags", []),
+            "categories": info.get("categories", []),
+            "chapters": info.get("chapters", []),
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+        }
+        CACHE.put("info", video_id, result, variant)
+        with contextlib.suppress(sqlite3.Error):
+            INDEX.set_title(video_id, result["title"])
+        return {"success": True, "info": result}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+# videos.list accepts up to 50 IDs per call, for 1 quota unit
+VIDEOS_BATCH_SIZE = 50
+VIDEOS_PARTS = "snippet,contentDetails,statistics"
+ISO_DURATION_PATTERN = re.compile(
+    r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$"
+)
+# Standard YouTube category IDs, for the names yt-dlp reports
+VIDEO_CATEGORIES = {
+    "1": "Film & Animation", "2": "Autos & Vehicles", "10": "Music", "15": "Pets & Animals",
+    "17": "Sports", "19": "Travel & Events", "20": "Gaming", "22": "People & Blogs",
+    "23": "Comedy", "24": "Entertainment", "25": "News & Politics", "26": "Howto & Style",
+    "27": "Education", "28": "Science & Technology", "29": "Nonprofits & Activism",
+}
+
+
+def parse_iso_duration(duration: str | None) -> int | None:
+    """Convert an ISO 8601 duration such as PT1H2M3S to seconds."""
+    match = ISO_DURATION_PATTERN.match(duration or "")
+    if not match:
+        return None
+    days, hours, minutes, seconds = (float(group or 0) for group in match.groups())
+    return int(days * 86400 + hours * 3600 + minutes * 60 + seconds)
+
+
+def info_from_api(item: dict[str, Any]) -> dict[str, Any]:
+    """Map a videos.list item onto the info schema yt-dlp extraction produces.
+
+    Chapters are parsed from the description, with end times, as yt-dlp does for
+    creator chapters.
+    """
+    snippet = item.get("snippet", {})
+    statistics = item.get("statistics", {})
+    video_id = item["id"]
+    duration = parse_iso_duration(item.get("contentDetails", {}).get("duration"))
+    description = snippet.get("description")
+
+    chapters = parse_chapters_from_description(description or "")
+    for chapter, following in itertools.zip_longest(chapters, chapters[1:]):
+        chapter["end_time"] = following["start_time"] if following else duration
+
+    category = VIDEO_CATEGORIES.get(snippet.get("categoryId", ""))
+    return {
+        "id": video_id,
+        "title": snippet.get("title"),
+        "channel": snippet.get("channelTitle"),
+        "channel_id": snippet.get("channelId"),
+        "duration": duration,
+        "duration_string": format_time_simple(duration) if duration is not None else None,
+        "view_count": int(statistics["viewCount"]) if "viewCount" in statistics else None,
+        "upload_date": (snippet.get("publishedAt") or "")[:10].replace("-", "") or None,
+        "description": description,
+        "tags": snippet.get("tags", []),
+        "categories": [category] if category else [],
+        "chapters": chapters,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+    }
+
+
+def get_video_infos(video_ids: Iterable[str], fallback: bool = True) -> dict[str, dict[str, Any]]:
+    """Get metadata for many videos, resolving cache misses with videos.list 50 IDs at a time.
+
+    Without an API key, and for videos the API does not return, each video falls
+    back to yt-dlp through get_video_info, unless fallback is off (then they are
+    left out). Results are keyed by video ID.
+    """
+    results: dict[str, dict[str, Any]] = {}
+    missing = []
+    for video_id in dict.fromkeys(video_ids):
+        cached = CACHE.get("info", video_id)
+        if cached is not None:
+            results[video_id] = {"success": True, "info": cached}
+        else:
+            missing.append(video_id)
+
+    if missing and get_youtube_api_key():
+        for start in range(0, len(missing), VIDEOS_BATCH_SIZE):
+            chunk = missing[start:start + VIDEOS_BATCH_SIZE]
+            try:
+                with TRACER.span("data-api.videos", ids=len(chunk)) as event:
+                    response = data_api_call(
+                        "videos.list",
+                        lambda youtube: youtube.videos().list(
+                            part=VIDEOS_PARTS, id=",".join(chunk), maxResults=VIDEOS_BATCH_SIZE
+                        ),
+                    )
+                    event["items"] = len(response.get("items", []))
+            except QuotaExceeded:
+                # The budget is spent: every remaining chunk falls back to yt-dlp below
+                break
+            except Exception as e:
+                if "quotaExceeded" in str(e):
+                    QUOTA.exhaust()
+                    break
+                # The whole chunk falls back to yt-dlp below
+                continue
+            for item in response.get("items", []):
+                info = info_from_api(item)
+                CACHE.put("info", info["id"], info)
+                with contextlib.suppress(sqlite3.Error):
+                    INDEX.set_title(info["id"], info["title"])
+                results[info["id"]] = {"success": True, "info": info}
+
+    if fallback:
+        for video_id in missing:
+            if video_id not in results:
+                results[video_id] = get_video_info(video_id)
+    return results
+
+
 def get_chapters(video_id: str) -> dict[str, Any]:
     """Extract chapters from video."""
     info_result = get_video_info(video_id)
@@ -212,7 +1631,43 @@ def get_chapters(video_id: str) -> dict[str, Any]:
             "end_time": ch.get("end_time"),
         })
 
-    return {"success": True, "chapters": formatted}
+    return {"success": True, "chapters": formatted, "duration": info.get("duration")}
+
+
+def align_chapters(snippets: Any, chapters: list[dict], duration: float | None = None) -> list[dict[str, Any]]:
+    """Assign transcript snippets to chapters by bisecting start times against chapter boundaries.
+
+    Snippets before the first chapter go to the first one. Each chapter gains its
+    text, word and snippet counts, and a resolved end time; a last chapter without
+    one ends at the video duration, or at the last snippet when that is unknown.
+    """
+    transcript = as_timed(snippets)
+    boundaries = [ch.get("start_time", 0) for ch in chapters]
+    texts: list[list[str]] = [[] for _ in chapters]
+    words = [0] * len(chapters)
+
+    for text, start, _ in transcript:
+        index = max(bisect.bisect_right(boundaries, start) - 1, 0)
+        texts[index].append(text)
+        words[index] += len(text.split())
+
+    video_end = duration if duration is not None else transcript.end()
+    aligned = []
+    for i, ch in enumerate(chapters):
+        start = boundaries[i]
+        end = ch.get("end_time")
+        if end is None:
+            end = boundaries[i + 1] if i + 1 < len(chapters) else max(video_end, start)
+        aligned.append({
+            **ch,
+            "end_time": end,
+            "end_time_formatted": format_time_simple(end),
+            "duration": end - start,
+            "snippet_count": len(texts[i]),
+            "word_count": words[i],
+            "text": " ".join(texts[i]),
+        })
+    return aligned
 
 
 def parse_chapters_from_description(description: str) -> list[dict]:
@@ -242,102 +1697,1293 @@ def parse_chapters_from_description(description: str) -> list[dict]:
     return chapters
 
 
-def get_comments(video_id: str, max_results: int = 100) -> dict[str, Any]:
-    """Fetch video comments using YouTube Data API."""
-    api_key = get_youtube_api_key()
-    if not api_key:
+# Token budgeting without a tokenizer: ~4 characters per token for English text
+CHARS_PER_TOKEN = 4
+DEFAULT_CHUNK_TOKENS = 4000
+DEFAULT_WINDOW_SECONDS = 600
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def chunk_transcript(
+    snippets: Any,
+    chapters: list[dict],
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    window: float = DEFAULT_WINDOW_SECONDS,
+) -> list[dict[str, Any]]:
+    """Split timed snippets into chunks along chapters (or fixed windows), each under max_tokens.
+
+    A chapter longer than the budget is split at snippet boundaries into numbered parts.
+    """
+    transcript = as_timed(snippets)
+    if not len(transcript):
+        return []
+
+    if chapters:
+        sections = [(ch.get("title"), ch.get("start_time", 0)) for ch in chapters]
+    else:
+        last_end = transcript.end()
+        sections = [(None, float(start)) for start in range(0, int(last_end) + 1, max(int(window), 1))]
+
+    chunks: list[dict[str, Any]] = []
+    texts: list[str] = []
+    tokens = 0
+    part = 1
+    section = 0
+    chunk_start = chunk_end = 0.0
+
+    def close() -> None:
+        text = " ".join(texts)
+        chunks.append({
+            "index": len(chunks),
+            "chapter": sections[section][0],
+            "part": part,
+            "start": chunk_start,
+            "end": chunk_end,
+            "start_formatted": format_time_simple(chunk_start),
+            "end_formatted": format_time_simple(chunk_end),
+            "token_estimate": estimate_tokens(text),
+            "text": text,
+        })
+
+    rows: Iterable[tuple[str, float, float]] = transcript
+    starts = transcript.starts
+    if not all(map(operator.le, starts, itertools.islice(starts, 1, None))):
+        rows = sorted(transcript, key=operator.itemgetter(1))
+
+    for text, start, duration in rows:
+        # Sections and snippets are both time-ordered, so advance in one sweep
+        next_section = section
+        while next_section + 1 < len(sections) and start >= sections[next_section + 1][1]:
+            next_section += 1
+
+        entry_tokens = estimate_tokens(text) + 1
+        if texts and (next_section != section or tokens + entry_tokens > max_tokens):
+            close()
+            part = part + 1 if next_section == section else 1
+            texts, tokens = [], 0
+
+        if not texts:
+            chunk_start = start
+        section = next_section
+        texts.append(text)
+        tokens += entry_tokens
+        chunk_end = start + duration
+
+    close()
+    return chunks
+
+
+class CommentsError(Exception):
+    """Comments could not be fetched; the message is suitable for the user."""
+
+
+class QuotaExceeded(CommentsError):
+    """The Data API daily unit budget is spent; calls are deferred until it resets."""
+
+
+class CommentsDisabled(CommentsError):
+    """The video has comments turned off; fetching again will not change that."""
+
+
+# Data API units charged per call, the daily budget, and the pacing bucket
+DATA_API_COSTS = {
+    "commentThreads.list": 1,
+    "comments.list": 1,
+    "videos.list": 1,
+    "search.list": 100,
+}
+DATA_API_DAILY_QUOTA = 10_000
+DATA_API_RATE = 50.0
+DATA_API_BURST = 500
+
+
+def quota_day() -> str:
+    """Get the current quota day; Data API quotas reset at midnight Pacific time."""
+    try:
+        from zoneinfo import ZoneInfo
+
+        tz = ZoneInfo("America/Los_Angeles")
+    except Exception:
+        tz = timezone(timedelta(hours=-8))
+    return datetime.now(tz).date().isoformat()
+
+
+class QuotaScheduler:
+    """Token-bucket pacing for Data API calls under a daily unit budget persisted across runs."""
+
+    def __init__(self, daily_budget: int | None = None, rate: float = DATA_API_RATE, burst: int = DATA_API_BURST):
+        self.daily_budget = daily_budget or int(os.environ.get("YOUTUBE_API_QUOTA", DATA_API_DAILY_QUOTA))
+        self.rate = rate
+        self.burst = burst
+        self.path: Path | None = None
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.path is None:
+                self.path = get_cache_dir() / "quota.db"
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS spend (
+                    day TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    units INTEGER NOT NULL,
+                    calls INTEGER NOT NULL,
+                    PRIMARY KEY (day, method)
+                )
+            """)
+        return conn
+
+    def _charge(self, day: str, method: str, units: int, calls: int = 1) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO spend (day, method, units, calls) VALUES (?, ?, ?, ?)
+                ON CONFLICT (day, method) DO UPDATE SET units = units + excluded.units, calls = calls + excluded.calls
+                """,
+                (day, method, units, calls),
+            )
+
+    def spent(self, day: str | None = None) -> int:
+        row = self._conn().execute("SELECT SUM(units) FROM spend WHERE day = ?", (day or quota_day(),)).fetchone()
+        return row[0] or 0
+
+    def acquire(self, method: str) -> None:
+        """Charge one call to the daily budget, waiting for the bucket to refill if needed."""
+        cost = DATA_API_COSTS.get(method, 1)
+        day = quota_day()
+        with self._lock:
+            spent = self.spent(day)
+            if spent + cost > self.daily_budget:
+                raise QuotaExceeded(
+                    f"Data API daily quota exhausted ({spent}/{self.daily_budget} units); resets at midnight Pacific time"
+                )
+
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    break
+                time.sleep((cost - self._tokens) / self.rate)
+
+            self._charge(day, method, cost)
+
+    def refund(self, method: str) -> None:
+        """Return a call's units after a 304: a revalidation is recorded but not charged."""
+        cost = DATA_API_COSTS.get(method, 1)
+        day = quota_day()
+        with self._lock:
+            self._charge(day, method, -cost, -1)
+            self._charge(day, f"{method} (not modified)", 0)
+
+    def exhaust(self) -> None:
+        """Record that the API itself reported the quota spent, so later calls defer."""
+        day = quota_day()
+        with self._lock:
+            self._charge(day, "quotaExceeded", max(self.daily_budget - self.spent(day), 0), 0)
+
+    def status(self) -> dict[str, Any]:
+        day = quota_day()
+        rows = self._conn().execute("SELECT method, units, calls FROM spend WHERE day = ?", (day,)).fetchall()
+        used = sum(units for _, units, _ in rows)
         return {
-            "success": False,
-            "error": "YOUTUBE_API_KEY not found. Set it in environment, ~/.config/fabric/.env, or ~/.config/pais/.env",
+            "day": day,
+            "budget": self.daily_budget,
+            "used": used,
+            "remaining": max(self.daily_budget - used, 0),
+            "by_method": {method: {"units": units, "calls": calls} for method, units, calls in rows},
         }
 
+
+QUOTA = QuotaScheduler()
+
+
+# Data API page size ceiling for commentThreads.list and comments.list
+COMMENT_PAGE_SIZE = 100
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
+DISCOVERY_TTL = 30 * 24 * 3600
+
+_discovery: dict[str, dict[str, Any]] = {}
+_discovery_lock = threading.Lock()
+
+
+def get_discovery_document() -> dict[str, Any]:
+    """Load the Data API discovery document once per process, fetching it only as a last resort.
+
+    The copy bundled with google-api-python-client is preferred; otherwise a copy
+    kept in the cache directory, refreshed from the discovery service when stale.
+    """
+    with _discovery_lock:
+        document = _discovery.get("youtube")
+        if document is not None:
+            return document
+
+        content = None
+        with contextlib.suppress(ImportError):
+            from googleapiclient.discovery_cache import get_static_doc
+            content = get_static_doc("youtube", "v3")
+
+        if content is None:
+            path = get_cache_dir() / "discovery" / "youtube.v3.json"
+            if path.exists() and time.time() - path.stat().st_mtime < DISCOVERY_TTL:
+                content = path.read_text()
+            else:
+                import urllib.request
+
+                with (
+                    TRACER.span("data-api.discovery") as event,
+                    urllib.request.urlopen(DISCOVERY_URL, timeout=30) as response,
+                ):
+                    content = response.read().decode("utf-8")
+                    event["bytes"] = len(content)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(content)
+                tmp.replace(path)
+
+        document = _discovery["youtube"] = json.loads(content)
+        return document
+
+
+def build_youtube_client() -> Any:
+    """Build a Data API client from the cached discovery document."""
+    api_key = get_youtube_api_key()
+    if not api_key:
+        raise CommentsError(
+            "YOUTUBE_API_KEY not found. Set it in environment, ~/.config/fabric/.env, or ~/.config/pais/.env"
+        )
+
     try:
-        from googleapiclient.discovery import build
-        from googleapiclient.errors import HttpError
+        from googleapiclient.discovery import build_from_document
     except ImportError:
-        return {
-            "success": False,
-            "error": "google-api-python-client not installed. Run: uv pip install google-api-python-client",
-        }
+        raise CommentsError(
+            "google-api-python-client not installed. Run: uv pip install google-api-python-client"
+        ) from None
 
     try:
-        youtube = build("youtube", "v3", developerKey=api_key)
+        document = get_discovery_document()
+    except OSError as e:
+        raise CommentsError(f"Could not load the YouTube Data API discovery document: {e}") from e
+
+    with TRACER.span("data-api.build"):
+        return build_from_document(document, developerKey=api_key)
+
+
+class ClientPool:
+    """Idle Data API clients shared across threads, so their keep-alive connections are reused.
+
+    A client's HTTP object is not thread-safe, so each one is checked out by a
+    single thread at a time.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._idle: list[Any] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def client(self) -> Iterator[Any]:
+        with self._lock:
+            client = self._idle.pop() if self._idle else None
+        if client is None:
+            client = self.factory()
+        try:
+            yield client
+        finally:
+            with self._lock:
+                self._idle.append(client)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+
+DATA_API_CLIENTS = ClientPool(build_youtube_client)
+
+
+def data_api_call(method: str, request: Callable[[Any], Any], etag: str | None = None) -> dict[str, Any] | None:
+    """Execute one Data API request on a pooled client, charging quota for every attempt.
+
+    With an ETag the request is conditional; None means 304 Not Modified, which is refunded.
+    """
+    def attempt() -> dict[str, Any] | None:
+        QUOTA.acquire(method)
+        with DATA_API_CLIENTS.client() as youtube:
+            http_request = request(youtube)
+            if etag:
+                http_request.headers["If-None-Match"] = etag
+            try:
+                return http_request.execute()
+            except Exception as e:
+                if etag and str(getattr(getattr(e, "resp", None), "status", "")) == "304":
+                    QUOTA.refund(method)
+                    return None
+                raise
+
+    return UPSTREAM.call("data-api", attempt)
+
+
+def format_comment(snippet: dict) -> dict[str, Any]:
+    """Keep the fields the plugin returns from a comment snippet."""
+    return {
+        "author": snippet.get("authorDisplayName"),
+        "text": snippet.get("textDisplay"),
+        "likes": snippet.get("likeCount", 0),
+        "published": snippet.get("publishedAt"),
+    }
 
-        comments = []
-        request = youtube.commentThreads().list(
-            part="snippet,replies",
-            videoId=video_id,
-            textFormat="plainText",
-            maxResults=min(max_results, 100),
-        )
-        response = request.execute()
-
-        for item in response.get("items", []):
-            top_comment = item["snippet"]["topLevelComment"]["snippet"]
-            comment_data = {
-                "author": top_comment.get("authorDisplayName"),
-                "text": top_comment.get("textDisplay"),
-                "likes": top_comment.get("likeCount", 0),
-                "published": top_comment.get("publishedAt"),
-                "replies": [],
-            }
 
-            # Get replies if any
-            if item.get("replies"):
-                for reply in item["replies"]["comments"]:
-                    reply_snippet = reply["snippet"]
-                    comment_data["replies"].append({
-                        "author": reply_snippet.get("authorDisplayName"),
-                        "text": reply_snippet.get("textDisplay"),
-                        "likes": reply_snippet.get("likeCount", 0),
-                        "published": reply_snippet.get("publishedAt"),
-                    })
+def fetch_replies(thread_id: str) -> list[dict[str, Any]]:
+    """Page through every reply of one comment thread."""
+    replies = []
+    page_token = None
+
+    while True:
+        with TRACER.span("data-api.comments", thread_id=thread_id):
+            response = data_api_call("comments.list", lambda youtube: youtube.comments().list(
+                part="snippet",
+                parentId=thread_id,
+                textFormat="plainText",
+                maxResults=COMMENT_PAGE_SIZE,
+                pageToken=page_token,
+            ))
+
+        replies.extend(format_comment(item["snippet"]) for item in response.get("items", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return replies
+
+
+def iter_comments(
+    video_id: str,
+    max_results: int = 100,
+    page_token: str | None = None,
+    on_page: Callable[[list[dict[str, Any]], str | None], None] | None = None,
+    page_stats: dict[str, int] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield comment threads page by page, up to max_results threads (0 for all).
+
+    Threads whose inlined replies are truncated get their full reply list fetched
+    concurrently before the page is yielded. Paging starts at page_token, and
+    on_page sees each page's threads and the next page token before they are yielded.
+    A page whose reply fetches ran out of quota is yielded but not passed to on_page,
+    so a journaled run resumes from that page's own token and fetches it again.
+
+    Assembled pages are cached with their ETag; a page requested again is
+    conditional, and on 304 the stored page (replies included) is reused without
+    any reply fetches. page_stats counts "fetched" and "not_modified" pages.
+    """
+    try:
+        from googleapiclient.errors import HttpError
+    except ImportError:
+        raise CommentsError(
+            "google-api-python-client not installed. Run: uv pip install google-api-python-client"
+        ) from None
 
-            comments.append(comment_data)
+    remaining = max_results or None
 
-        return {
-            "success": True,
-            "comment_count": len(comments),
-            "comments": comments,
-        }
+    try:
+        with ThreadPoolExecutor(max_workers=BACKEND_LIMITS["data-api"]) as pool:
+            while remaining is None or remaining > 0:
+                page_size = COMMENT_PAGE_SIZE if remaining is None else min(remaining, COMMENT_PAGE_SIZE)
+                variant = f"{page_token or ''}:{page_size}"
+                cached = CACHE.lookup("comment-page", video_id, variant)
+                with TRACER.span("data-api.commentThreads", video_id) as event:
+                    response = data_api_call(
+                        "commentThreads.list",
+                        lambda youtube: youtube.commentThreads().list(
+                            part="snippet,replies",
+                            videoId=video_id,
+                            textFormat="plainText",
+                            maxResults=page_size,
+                            pageToken=page_token,
+                        ),
+                        etag=cached[1] if cached else None,
+                    )
+                    if response is None:
+                        event["cache"] = "not_modified"
+                    else:
+                        event["items"] = len(response.get("items", []))
+
+                exhausted = None
+                if response is None:
+                    threads = cached[0]["threads"]
+                    next_page_token = cached[0]["next_page_token"]
+                    CACHE.touch("comment-page", video_id, variant)
+                else:
+                    threads = []
+                    pending = {}
+                    for item in response.get("items", []):
+                        comment_data = format_comment(item["snippet"]["topLevelComment"]["snippet"])
+                        comment_data["reply_count"] = item["snippet"].get("totalReplyCount", 0)
+
+                        inlined = (item.get("replies") or {}).get("comments", [])
+                        comment_data["replies"] = [format_comment(reply["snippet"]) for reply in inlined]
+
+                        # The thread resource only inlines a handful of replies
+                        if comment_data["reply_count"] > len(inlined):
+                            pending[pool.submit(fetch_replies, item["id"])] = comment_data
+                        threads.append(comment_data)
+
+                    for future, comment_data in pending.items():
+                        try:
+                            comment_data["replies"] = future.result()
+                        except QuotaExceeded as e:
+                            # Keep the inlined replies and finish this page before stopping
+                            comment_data["replies_truncated"] = True
+                            exhausted = e
+
+                    next_page_token = response.get("nextPageToken")
+                    if not exhausted:
+                        CACHE.put(
+                            "comment-page",
+                            video_id,
+                            {"threads": threads, "next_page_token": next_page_token},
+                            variant,
+                            etag=response.get("etag"),
+                        )
+                if page_stats is not None:
+                    outcome = "not_modified" if response is None else "fetched"
+                    page_stats[outcome] = page_stats.get(outcome, 0) + 1
+
+                page_token = next_page_token
+                if on_page and not exhausted:
+                    on_page(threads, page_token)
+                yield from threads
+                if exhausted:
+                    raise exhausted
+
+                if remaining is not None:
+                    remaining -= len(threads)
+                if not page_token or not threads:
+                    return
 
     except HttpError as e:
         error_reason = e.error_details[0]["reason"] if e.error_details else str(e)
+        if "quotaExceeded" in str(e) or "quotaExceeded" in str(error_reason):
+            QUOTA.exhaust()
+            raise QuotaExceeded("Data API daily quota exhausted; resets at midnight Pacific time") from e
         if "commentsDisabled" in str(e):
-            return {"success": False, "error": "Comments are disabled for this video"}
-        return {"success": False, "error": f"YouTube API error: {error_reason}"}
+            raise CommentsDisabled("Comments are disabled for this video") from e
+        raise CommentsError(f"YouTube API error: {error_reason}") from e
+
+
+COMMENT_AGGREGATES = ("author",)
+
+
+class CommentRanking:
+    """Running top-k by likes (replies included) and per-author counters over streamed threads.
+
+    Holds at most `top` comments plus one counter per author, however many
+    threads stream through.
+    """
+
+    def __init__(self, top: int = 0, aggregate: str | None = None):
+        self.top = top
+        self.aggregate = aggregate
+        self.threads = 0
+        self.comments = 0
+        self.authors: dict[str, dict[str, int]] = {}
+        self._heap: list[tuple[int, int, dict[str, Any]]] = []
+        self._seq = 0
+
+    def add(self, thread: dict[str, Any]) -> None:
+        self.threads += 1
+        self._add({key: value for key, value in thread.items() if key != "replies"})
+        for reply in thread.get("replies", []):
+            self._add({**reply, "is_reply": True})
+
+    def _add(self, comment: dict[str, Any]) -> None:
+        self.comments += 1
+        likes = comment.get("likes") or 0
+
+        if self.top:
+            # Ties keep the earlier comment: later ones carry a smaller -seq and pop first
+            entry = (likes, -self._seq, comment)
+            self._seq += 1
+            if len(self._heap) < self.top:
+                heapq.heappush(self._heap, entry)
+            elif entry > self._heap[0]:
+                heapq.heapreplace(self._heap, entry)
+
+        if self.aggregate == "author":
+            stats = self.authors.setdefault(
+                comment.get("author") or "", {"comments": 0, "replies": 0, "likes": 0, "max_likes": 0}
+            )
+            stats["replies" if comment.get("is_reply") else "comments"] += 1
+            stats["likes"] += likes
+            stats["max_likes"] = max(stats["max_likes"], likes)
+
+    def result(self) -> dict[str, Any]:
+        result: dict[str, Any] = {"threads_scanned": self.threads, "comments_scanned": self.comments}
+        if self.top:
+            result["top"] = [comment for *_, comment in sorted(self._heap, reverse=True)]
+        if self.aggregate == "author":
+            result["authors"] = sorted(
+                ({"author": author, **stats} for author, stats in self.authors.items()),
+                key=lambda a: (-a["likes"], -(a["comments"] + a["replies"]), a["author"]),
+            )
+        return result
+
+
+def get_comments(
+    video_id: str,
+    max_results: int = 100,
+    top: int = 0,
+    aggregate: str | None = None,
+    page_token: str | None = None,
+    on_page: Callable[[list[dict[str, Any]], str | None], None] | None = None,
+) -> dict[str, Any]:
+    """Fetch video comments using YouTube Data API.
+
+    With top or aggregate set, threads are folded into a CommentRanking as pages
+    arrive instead of being collected. page_token and on_page pass through to
+    iter_comments.
+    """
+    ranking = CommentRanking(top, aggregate) if top or aggregate else None
+    comments: list[dict[str, Any]] = []
+    pages: dict[str, int] = {"fetched": 0, "not_modified": 0}
+    exhausted = False
+    try:
+        for thread in iter_comments(video_id, max_results, page_token, on_page, pages):
+            if ranking:
+                ranking.add(thread)
+            else:
+                comments.append(thread)
+    except QuotaExceeded as e:
+        # Keep what was harvested before the budget ran out
+        if not (ranking.threads if ranking else comments):
+            return {"success": False, "error": str(e), "quota": QUOTA.status()}
+        exhausted = True
+    except CommentsDisabled as e:
+        return {"success": False, "error": str(e), "permanent": True}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+    result: dict[str, Any] = {"success": True}
+    if ranking:
+        result.update(ranking.result())
+    else:
+        result.update(comment_count=len(comments), comments=comments)
+    if exhausted:
+        result["quota_exhausted"] = True
+    result["pages"] = pages
+    result["quota"] = QUOTA.status()
+    return result
+
+
+# Playlist and channel URLs are expanded to their videos with a flat listing
+COLLECTION_URL_PATTERN = re.compile(r"youtube\.com/(?:playlist\?|@|channel/|c/|user/)")
+CHANNEL_TABS = ("/videos", "/shorts", "/streams", "/playlists", "/featured")
+BATCH_RESOURCES = ("info", "transcript", "comments")
+
+
+VIDEO_ID_PATTERN = re.compile(r"^[\w-]{11}$")
+
+
+def iter_listing(url: str) -> tuple[dict[str, Any], Iterator[str]]:
+    """Flat-list a playlist or channel; returns its metadata and a lazy iterator of video IDs.
+
+    The raw, unprocessed listing pages through entries on demand, so callers that
+    stop early (e.g. at the first already-seen upload) only pay for the pages they read.
+    """
+    # Channel root pages list tabs rather than videos, so target the uploads tab
+    if "/playlist?" not in url and not url.rstrip("/").endswith(CHANNEL_TABS):
+        url = url.rstrip("/") + "/videos"
+
+    ydl_opts = {
+        "quiet": True,
+        "no_warnings": True,
+        "extract_flat": "in_playlist",
+    }
+
+    with TRACER.span("ytdlp.listing", source=url):
+        listing = UPSTREAM.call("ytdlp", lambda: get_ydl(ydl_opts).extract_info(url, download=False, process=False))
+
+    def video_ids() -> Iterator[str]:
+        for entry in listing.get("entries") or []:
+            if entry and VIDEO_ID_PATTERN.match(entry.get("id") or ""):
+                yield entry["id"]
+
+    meta = {key: listing.get(key) for key in ("id", "title", "channel", "channel_id")}
+    return meta, video_ids()
+
+
+def expand_source(url: str) -> list[str]:
+    """Resolve a video, playlist, or channel URL to a list of video IDs."""
+    if not COLLECTION_URL_PATTERN.search(url):
+        return [extract_video_id(url)]
+
+    _, video_ids = iter_listing(url)
+    return list(video_ids)
+
+
+def read_batch_sources(path: str | None) -> list[str]:
+    """Read URLs, one per line, from a file or stdin; blank lines and # comments are skipped."""
+    if path and path != "-":
+        with open(Path(path).expanduser()) as f:
+            lines = f.readlines()
+    else:
+        lines = sys.stdin.readlines()
+
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def get_journal_path(sources: list[str], resources: list[str], max_comments: int) -> Path:
+    """Get the default journal for a batch, keyed by its sources and settings."""
+    key = hashlib.sha256(json.dumps([sources, sorted(resources), max_comments]).encode()).hexdigest()[:16]
+    return get_cache_dir() / "journals" / f"batch-{key}.jsonl"
+
+
+class BatchJournal:
+    """Append-only write-ahead log of finished (video_id, resource) units and fetched comment pages.
+
+    Each entry is flushed and fsynced before the work it records is reported, so a
+    run killed at any point resumes from its last completed unit or comment page.
+    Results themselves are not journaled: info and transcripts come back from the
+    response cache, comments from the journaled pages. A live run only tracks the
+    last page token per video; thread lists are rebuilt on replay, and only for
+    videos whose comments never finished.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        self.units: set[tuple[str, str]] = set()
+        self.tokens: dict[str, str | None] = {}
+        self.threads: dict[str, list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and path.exists():
+            self._replay()
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        # A crash can leave a torn last line; start ours on a fresh one
+        if resume and self._file.tell() and not path.read_bytes().endswith(b"\n"):
+            self._file.write("\n")
+
+    def _replay(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                video_id = entry.get("video_id")
+                if entry.get("op") == "done":
+                    self.units.add((video_id, entry["resource"]))
+                    if entry["resource"] == "comments":
+                        self.threads.pop(video_id, None)
+                elif entry.get("op") == "page" and (video_id, "comments") not in self.units:
+                    self.threads.setdefault(video_id, []).extend(entry["threads"])
+                    self.tokens[video_id] = entry["next_page_token"]
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def is_done(self, video_id: str, resource: str) -> bool:
+        return (video_id, resource) in self.units
+
+    def video_done(self, video_id: str, resources: Iterable[str]) -> bool:
+        return all((video_id, resource) in self.units for resource in resources)
+
+    def done(self, video_id: str, resource: str) -> None:
+        if (video_id, resource) not in self.units:
+            self._append({"op": "done", "video_id": video_id, "resource": resource})
+            self.units.add((video_id, resource))
+
+    def page(self, video_id: str, threads: list[dict[str, Any]], next_page_token: str | None) -> None:
+        self._append({"op": "page", "video_id": video_id, "threads": threads, "next_page_token": next_page_token})
+        self.tokens[video_id] = next_page_token
+
+    def comment_pages(self, video_id: str) -> tuple[list[dict[str, Any]], str | None, bool]:
+        """Hand over the replayed threads, the token to resume from, and whether paging finished."""
+        if video_id not in self.tokens:
+            return [], None, False
+        token = self.tokens[video_id]
+        return self.threads.pop(video_id, []), token, token is None
+
+    def prune(self, resources: Iterable[str]) -> None:
+        """Drop replayed pages of videos that need no more work."""
+        for video_id in [vid for vid in self.tokens if self.video_done(vid, resources)]:
+            del self.tokens[video_id]
+            self.threads.pop(video_id, None)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def process_video(
+    video_id: str,
+    resources: Iterable[str],
+    max_comments: int = 100,
+    journal: BatchJournal | None = None,
+    dedupe: str | None = None,
+    dedupe_threshold: float = DEDUPE_THRESHOLD,
+    info_result: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Fetch the requested resources for one video into a single result record.
+
+    With a journal, each successful resource is recorded as a finished unit and
+    comments resume from the last journaled page. With dedupe set to "flag" or
+    "skip", a near-duplicate of an earlier transcript is marked duplicate_of, and
+    with "skip" nothing else is fetched for it. A prefetched info_result (see
+    get_video_infos) replaces the per-video metadata fetch. Resources that failed
+    for good (no captions, comments turned off) are listed under "unavailable".
+    """
+    result: dict[str, Any] = {"video_id": video_id, "success": True}
+
+    try:
+        if dedupe:
+            duplicate = check_duplicate(video_id, dedupe_threshold)
+            if duplicate:
+                result["duplicate_of"] = duplicate
+                if dedupe == "skip":
+                    result["skipped"] = "duplicate"
+                    return result
+
+        if "info" in resources:
+            info_result = info_result or get_video_info(video_id)
+            if info_result["success"]:
+                result["info"] = info_result["info"]
+                if journal:
+                    journal.done(video_id, "info")
+            else:
+                result["info_error"] = info_result.get("error")
+
+        if "transcript" in resources:
+            transcript_result = get_transcript(video_id, "text")
+            if transcript_result["success"]:
+                result["transcript"] = transcript_result["transcript"]
+                if journal:
+                    journal.done(video_id, "transcript")
+            else:
+                result["transcript_error"] = transcript_result.get("error")
+                if transcript_result.get("permanent"):
+                    result.setdefault("unavailable", []).append("transcript")
+
+        if "comments" in resources:
+            prior, page_token, paged = journal.comment_pages(video_id) if journal else ([], None, False)
+            if paged or (max_comments and len(prior) >= max_comments):
+                comments_result: dict[str, Any] = {"success": True, "comments": []}
+            else:
+                comments_result = get_comments(
+                    video_id,
+                    max_comments - len(prior) if max_comments else 0,
+                    page_token=page_token,
+                    on_page=functools.partial(journal.page, video_id) if journal else None,
+                )
+            if comments_result["success"]:
+                result["comments"] = prior + comments_result["comments"]
+                if comments_result.get("quota_exhausted"):
+                    result["comments_truncated"] = True
+                elif journal:
+                    journal.done(video_id, "comments")
+            else:
+                result["comments_error"] = comments_result.get("error")
+                if comments_result.get("permanent"):
+                    result.setdefault("unavailable", []).append("comments")
+            if "quota" in comments_result:
+                result["quota_remaining"] = comments_result["quota"]["remaining"]
+    finally:
+        # Each video is independent; free its memoized payloads as soon as it is emitted
+        reset_memo(video_id)
+
+    result["success"] = not any(key.endswith("_error") for key in result)
+    return result
+
+
+def get_sync_manifest_path(output_dir: Path) -> Path:
+    return output_dir / "sync" / "manifest.json"
+
+
+def load_sync_manifest(output_dir: Path) -> dict[str, Any]:
+    """Load per-source sync state; an absent manifest means nothing has been synced."""
+    path = get_sync_manifest_path(output_dir)
+    if not path.exists():
+        return {"sources": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_sync_manifest(output_dir: Path, manifest: dict[str, Any]) -> None:
+    """Write the manifest atomically so an interrupted run never corrupts it."""
+    path = get_sync_manifest_path(output_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    tmp_path.replace(path)
+
+
+def sync_source(
+    url: str,
+    state: dict[str, Any],
+    output_dir: Path,
+    resources: list[str],
+    limit: int = 0,
+    workers: int = 4,
+) -> dict[str, Any]:
+    """Fetch only uploads not yet seen for one channel or playlist, updating state in place."""
+    meta, video_ids = iter_listing(url)
+    seen = set(state.get("seen", []))
+    is_playlist = "/playlist?" in url
+
+    new_ids = []
+    for video_id in video_ids:
+        if video_id in seen:
+            # Channel uploads are newest first: everything past here is already synced
+            if not is_playlist:
+                break
+            continue
+        new_ids.append(video_id)
+
+    queued = new_ids[:limit] if limit else new_ids
+    skipped = new_ids[len(queued):]
+    # Earlier failures sit behind the seen cutoff, so they are queued from the manifest instead
+    retry = [vid for vid in state.get("retry", []) if vid not in queued]
+    to_fetch = queued + retry
+
+    source_dir = output_dir / "sync" / re.sub(r"[^\w.-]+", "_", meta.get("id") or url)
+    source_dir.mkdir(parents=True, exist_ok=True)
+
+    infos = get_video_infos(to_fetch, fallback=False) if "info" in resources else {}
+    fetched, failed = [], []
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for result in pool.map(
+            lambda vid: process_video(vid, resources, info_result=infos.get(vid)), to_fetch
+        ):
+            (source_dir / f"{result['video_id']}.json").write_text(json.dumps(result, indent=2))
+            # Any failure is retried next run unless the resource is gone for good
+            unavailable = result.get("unavailable", [])
+            if "comments_truncated" in result or any(
+                f"{resource}_error" in result and resource not in unavailable for resource in resources
+            ):
+                failed.append(result["video_id"])
+            else:
+                fetched.append(result["video_id"])
+            upload_date = (result.get("info") or {}).get("upload_date")
+            if upload_date and upload_date > (state.get("last_upload_date") or ""):
+                state["last_upload_date"] = upload_date
+
+    state["title"] = meta.get("title") or state.get("title")
+    # Skipped uploads count as seen; failed fetches are also seen but stay queued for retry
+    state["seen"] = new_ids + state.get("seen", [])
+    state["retry"] = failed
+    state["last_sync"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    return {
+        "url": url,
+        "title": state["title"],
+        "output_dir": str(source_dir),
+        "new": len(new_ids),
+        "retried": len(retry),
+        "fetched": fetched,
+        "failed": failed,
+        "skipped": len(skipped),
+        "last_upload_date": state.get("last_upload_date"),
+    }
+
+
+# Columnar export: file extension per format, and the tables written
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+EXPORT_TABLES = ("videos", "snippets", "comments")
+# Snippet batches are written once this many rows are pending (one Parquet row group)
+EXPORT_ROW_GROUP_ROWS = 64 * 1024
+
+
+def get_export_manifest_path(output_dir: Path) -> Path:
+    """Get the manifest recording what an export directory already holds."""
+    return output_dir / "manifest.json"
+
+
+def iter_result_records(paths: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Yield per-video result records from batch NDJSON output and sync JSON files or directories."""
+    for raw in paths:
+        path = Path(raw).expanduser()
+        files = sorted(path.rglob("*.json*")) if path.is_dir() else [path]
+        for file in files:
+            if file.name == "manifest.json":
+                continue
+            text = file.read_text()
+            if file.suffix in (".ndjson", ".jsonl"):
+                records = [json.loads(line) for line in text.splitlines() if line.strip()]
+            else:
+                records = [json.loads(text)]
+            for record in records:
+                if isinstance(record, dict) and record.get("video_id"):
+                    yield record
+
+
+def video_row(video_id: str, info: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "video_id": video_id,
+        "title": info.get("title"),
+        "channel": info.get("channel"),
+        "channel_id": info.get("channel_id"),
+        "upload_date": info.get("upload_date"),
+        "duration": info.get("duration"),
+        "view_count": info.get("view_count"),
+        "tags": info.get("tags") or [],
+        "categories": info.get("categories") or [],
+        "description": info.get("description"),
+    }
+
+
+def comment_rows(video_id: str, threads: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Flatten comment threads; replies point at their thread's row through parent_index."""
+    index = 0
+    for thread in threads:
+        parent = index
+        for comment, parent_index in [(thread, None), *((reply, parent) for reply in thread.get("replies", []))]:
+            yield {
+                "video_id": video_id,
+                "comment_index": index,
+                "parent_index": parent_index,
+                "author": comment.get("author"),
+                "text": comment.get("text"),
+                "likes": comment.get("likes"),
+                "published": comment.get("published"),
+                "reply_count": comment.get("reply_count") if parent_index is None else None,
+            }
+            index += 1
+
+
+def snippet_batch(pa: Any, video_id: str, language: str, transcript: TimedTranscript) -> Any:
+    """Wrap a transcript's columns as an Arrow record batch without copying them."""
+    count = len(transcript)
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.repeat(video_id, count).cast(pa.string()),
+            pa.repeat(language, count).cast(pa.string()),
+            pa.array(range(count), pa.int32()),
+            pa.Array.from_buffers(pa.float64(), count, [None, pa.py_buffer(transcript.starts)]),
+            pa.Array.from_buffers(pa.float64(), count, [None, pa.py_buffer(transcript.durations)]),
+            # uint64 offsets share the int64 layout of large_string offsets
+            pa.Array.from_buffers(
+                pa.large_string(), count, [None, pa.py_buffer(transcript.offsets), pa.py_buffer(transcript.blob)]
+            ),
+        ],
+        names=["video_id", "language", "index", "start", "duration", "text"],
+    )
+
+
+def export_corpus(output_dir: Path, fmt: str, sources: list[str]) -> dict[str, Any]:
+    """Append videos, snippets, and comments not yet exported as one new part file per table.
+
+    Snippets are streamed to their part file a row group at a time, so only that
+    many transcripts are held at once. A cache entry that cannot be read aborts
+    the export and removes its part files.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return {"success": False, "error": "pyarrow not installed. Run: uv pip install pyarrow"}
+
+    manifest_path = get_export_manifest_path(output_dir)
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    if manifest.get("format", fmt) != fmt:
+        return {
+            "success": False,
+            "error": f"{output_dir} holds an export in {manifest['format']} format; use --format={manifest['format']}",
+        }
+    exported = {table: set(manifest.get("exported", {}).get(table, [])) for table in EXPORT_TABLES}
+    new_keys: dict[str, list[str]] = {table: [] for table in EXPORT_TABLES}
+
+    schemas = {
+        "videos": pa.schema([
+            ("video_id", pa.string()), ("title", pa.string()), ("channel", pa.string()),
+            ("channel_id", pa.string()), ("upload_date", pa.string()), ("duration", pa.float64()),
+            ("view_count", pa.int64()), ("tags", pa.list_(pa.string())),
+            ("categories", pa.list_(pa.string())), ("description", pa.string()),
+        ]),
+        "comments": pa.schema([
+            ("video_id", pa.string()), ("comment_index", pa.int32()), ("parent_index", pa.int32()),
+            ("author", pa.string()), ("text", pa.string()), ("likes", pa.int64()),
+            ("published", pa.string()), ("reply_count", pa.int64()),
+        ]),
+    }
+
+    part = manifest.get("parts", 0) + 1
+    written: dict[str, dict[str, Any]] = {}
+
+    def open_writer(stack: contextlib.ExitStack, name: str, schema: Any) -> Any:
+        path = output_dir / name / f"part-{part:05d}.{EXPORT_FORMATS[fmt]}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written[name] = {"rows": 0, "file": str(path)}
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            return stack.enter_context(pq.ParquetWriter(str(path), schema, compression="zstd"))
+        sink = stack.enter_context(pa.OSFile(str(path), "wb"))
+        return stack.enter_context(pa.ipc.new_file(sink, schema))
+
+    def write(writer: Any, name: str, table: Any) -> None:
+        with TRACER.span("export.write", table=name) as event:
+            writer.write_table(table)
+            event["rows"] = table.num_rows
+        written[name]["rows"] += table.num_rows
+
+    videos: list[dict[str, Any]] = []
+    comments: list[dict[str, Any]] = []
+
+    def add_video(video_id: str, info: dict[str, Any]) -> None:
+        if video_id not in exported["videos"]:
+            exported["videos"].add(video_id)
+            new_keys["videos"].append(video_id)
+            videos.append(video_row(video_id, info))
+
+    try:
+        with contextlib.ExitStack() as stack:
+            snippet_writer = None
+            pending: list[Any] = []
+            pending_rows = 0
+            for video_id, lang, fetched in CACHE.iter_kind("transcript", strict=True):
+                language = fetched.get("language") or lang
+                key = f"{video_id}:{language}"
+                if key in exported["snippets"]:
+                    continue
+                exported["snippets"].add(key)
+                new_keys["snippets"].append(key)
+                batch = snippet_batch(pa, video_id, language, as_timed(fetched["snippets"]))
+                snippet_writer = snippet_writer or open_writer(stack, "snippets", batch.schema)
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                # Written batches drop the last reference to their transcript's buffers
+                if pending_rows >= EXPORT_ROW_GROUP_ROWS:
+                    write(snippet_writer, "snippets", pa.Table.from_batches(pending))
+                    pending, pending_rows = [], 0
+            if pending:
+                write(snippet_writer, "snippets", pa.Table.from_batches(pending))
+            del pending
+
+            for video_id, _, info in CACHE.iter_kind("info", strict=True):
+                add_video(video_id, info)
+            for record in iter_result_records(sources):
+                video_id = record["video_id"]
+                if record.get("info"):
+                    add_video(video_id, record["info"])
+                if record.get("comments") and video_id not in exported["comments"]:
+                    exported["comments"].add(video_id)
+                    new_keys["comments"].append(video_id)
+                    comments.extend(comment_rows(video_id, record["comments"]))
+
+            for name, rows in (("videos", videos), ("comments", comments)):
+                if rows:
+                    table = pa.Table.from_pylist(rows, schemas[name])
+                    write(open_writer(stack, name, table.schema), name, table)
+    except (OSError, ValueError) as e:
+        for entry in written.values():
+            Path(entry["file"]).unlink(missing_ok=True)
+        return {"success": False, "error": f"Export aborted, nothing written: {e}"}
+
+    for entry in written.values():
+        entry["bytes"] = Path(entry["file"]).stat().st_size
+
+    if written:
+        manifest = {
+            "format": fmt,
+            "parts": part,
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "exported": {table: sorted(keys) for table, keys in exported.items()},
+        }
+        output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        tmp.replace(manifest_path)
+
+    return {
+        "success": True,
+        "output_dir": str(output_dir),
+        "format": fmt,
+        "written": written,
+        "new": {table: len(keys) for table, keys in new_keys.items()},
+    }
+
+
+# Output options set per invocation by run_action
+OUTPUT_OPTIONS = {"compact": False}
+
+
+class _CountingWriter:
+    """Forward writes to a stream while counting the characters written."""
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self.count = 0
+
+    def write(self, text: str) -> int:
+        self.count += len(text)
+        return self.stream.write(text)
+
+
+def print_json(result: Any) -> None:
+    """Write a command result to stdout: indented by default, one line with --compact."""
+    if TRACER.collected is not None and isinstance(result, dict):
+        result = {**result, "timings": timings_summary(TRACER.collected)}
+    if UPSTREAM.counters and isinstance(result, dict):
+        result = {**result, "upstream": UPSTREAM.stats()}
+
+    with TRACER.span("serialize") as event:
+        out = _CountingWriter(sys.stdout)
+        if OUTPUT_OPTIONS["compact"]:
+            json.dump(result, out, separators=(",", ":"))
+        else:
+            json.dump(result, out, indent=2)
+        out.write("\n")
+        # json.dump escapes non-ASCII by default, so characters are bytes here
+        event["bytes"] = out.count
+
+
+def timings_summary(spans: list[dict[str, Any]]) -> dict[str, Any]:
+    """Total time and call count per stage, plus the individual spans recorded so far."""
+    stages: dict[str, dict[str, Any]] = {}
+    for span in spans:
+        stage = stages.setdefault(span["stage"], {"calls": 0, "total_ms": 0.0})
+        stage["calls"] += 1
+        stage["total_ms"] = round(stage["total_ms"] + span["duration_ms"], 3)
+    return {"stages": stages, "spans": list(spans)}
+
+
+def write_ndjson(record: dict[str, Any]) -> None:
+    """Write one NDJSON record and flush so consumers see it immediately."""
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def parse_options(args: list[str]) -> tuple[list[str], dict[str, str]]:
+    """Split args into positionals and --key=value options (a bare --flag maps to "true")."""
+    positional = []
+    options = {}
+    for arg in args:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value or "true"
+        else:
+            positional.append(arg)
+    return positional, options
+
 
 def cmd_transcript(args: list[str]) -> None:
     """Handle transcript command."""
-    if not args:
-        print(json.dumps({"success": False, "error": "Usage: transcript <url> [format]"}))
+    positional, options = parse_options(args)
+    if not positional:
+        print(json.dumps({
+            "success": False,
+            "error": "Usage: transcript <url> [format[,format...]] [--languages=en,de,...] [--output-dir=DIR]",
+        }))
         sys.exit(1)
 
-    url = args[0]
-    fmt = args[1] if len(args) > 1 else "text"
+    url = positional[0]
+    formats = (positional[1] if len(positional) > 1 else "text").split(",")
 
     try:
         video_id = extract_video_id(url)
-        result = get_transcript(video_id, fmt)
-        print(json.dumps(result, indent=2))
+
+        if "languages" in options:
+            languages = tuple(dict.fromkeys(code.strip() for code in options["languages"].split(",") if code.strip()))
+            cmd_transcript_languages(video_id, languages, formats, options.get("output-dir"))
+            return
+
+        # A single format with no output dir keeps the inline JSON response
+        if len(formats) == 1 and "output-dir" not in options:
+            print_json(get_transcript(video_id, formats[0]))
+            return
+
+        fetched = fetch_transcript(video_id)
+        if not fetched["success"]:
+            print_json(fetched)
+            sys.exit(1)
+
+        rendered = render_transcripts(fetched["snippets"], formats)
+        files = write_transcripts(rendered, get_output_dir(options.get("output-dir")), video_id)
+        print_json({"success": True, "video_id": video_id, "files": files})
+
     except ValueError as e:
         print(json.dumps({"success": False, "error": str(e)}))
         sys.exit(1)
 
 
+def write_transcripts(rendered: dict[str, Any], output_dir: Path, stem: str) -> dict[str, str]:
+    """Write each rendered format to <output_dir>/<stem>.<ext>; returns the paths by format."""
+    files = {}
+    for fmt, content in rendered.items():
+        path = output_dir / f"{stem}.{TRANSCRIPT_FORMATS[fmt]}"
+        if fmt == "json":
+            content = json.dumps(content, indent=2)
+        path.write_text(content + "\n")
+        files[fmt] = str(path)
+    return files
+
+
+def cmd_transcript_languages(
+    video_id: str,
+    languages: tuple[str, ...],
+    formats: list[str],
+    output_dir: str | None,
+) -> None:
+    """Render several languages of one transcript, inline or to <video-id>.<lang>.<ext> files."""
+    if not languages:
+        print(json.dumps({"success": False, "error": "--languages needs at least one language code"}))
+        sys.exit(1)
+    # Reject unknown formats before fetching anything
+    render_transcripts([], formats)
+
+    fetched = fetch_transcripts(video_id, languages)
+    if not fetched["success"]:
+        print_json(fetched)
+        sys.exit(1)
+
+    inline = len(formats) == 1 and output_dir is None
+    directory = None if inline else get_output_dir(output_dir)
+    transcripts = {}
+    for language, track in fetched["transcripts"].items():
+        rendered = render_transcripts(track["snippets"], formats)
+        entry = {"translated": track["translated"], "source_language": track["source_language"]}
+        if inline:
+            entry["transcript"] = rendered[formats[0]]
+        else:
+            entry["files"] = write_transcripts(rendered, directory, f"{video_id}.{language}")
+        transcripts[language] = entry
+
+    result: dict[str, Any] = {"success": True, "video_id": video_id, "transcripts": transcripts}
+    if "errors" in fetched:
+        result["errors"] = fetched["errors"]
+    print_json(result)
+
+
 def cmd_chapters(args: list[str]) -> None:
     """Handle chapters command."""
-    if not args:
-        print(json.dumps({"success": False, "error": "Usage: chapters <url>"}))
+    positional, options = parse_options(args)
+    if not positional:
+        print(json.dumps({"success": False, "error": "Usage: chapters <url> [--with-text]"}))
         sys.exit(1)
 
     try:
-        video_id = extract_video_id(args[0])
+        video_id = extract_video_id(positional[0])
         result = get_chapters(video_id)
-        print(json.dumps(result, indent=2))
+        if "with-text" in options and result.get("chapters"):
+            transcript_result = fetch_transcript(video_id)
+            if transcript_result["success"]:
+                result["chapters"] = align_chapters(
+                    transcript_result["snippets"], result["chapters"], result.get("duration")
+                )
+            else:
+                result["transcript_error"] = transcript_result.get("error")
+        print_json(result)
     except ValueError as e:
         print(json.dumps({"success": False, "error": str(e)}))
         sys.exit(1)
@@ -345,14 +2991,22 @@ def cmd_chapters(args: list[str]) -> None:
 
 def cmd_info(args: list[str]) -> None:
     """Handle info command."""
-    if not args:
-        print(json.dumps({"success": False, "error": "Usage: info <url>"}))
+    positional, options = parse_options(args)
+    if not positional:
+        print(json.dumps({"success": False, "error": "Usage: info <url> [url...] [--full]"}))
         sys.exit(1)
 
     try:
-        video_id = extract_video_id(args[0])
-        result = get_video_info(video_id)
-        print(json.dumps(result, indent=2))
+        video_ids = [extract_video_id(url) for url in positional]
+        if len(video_ids) == 1 or "full" in options:
+            results = {video_id: get_video_info(video_id, "full" in options) for video_id in video_ids}
+        else:
+            results = get_video_infos(video_ids)
+        if len(video_ids) == 1:
+            print_json(results[video_ids[0]])
+        else:
+            videos = [{"video_id": video_id, **results[video_id]} for video_id in video_ids]
+            print_json({"success": any(v["success"] for v in videos), "videos": videos})
     except ValueError as e:
         print(json.dumps({"success": False, "error": str(e)}))
         sys.exit(1)
@@ -360,33 +3014,65 @@ def cmd_info(args: list[str]) -> None:
 
 def cmd_comments(args: list[str]) -> None:
     """Handle comments command."""
-    if not args:
-        print(json.dumps({"success": False, "error": "Usage: comments <url> [max_results]"}))
+    positional, options = parse_options(args)
+    if not positional:
+        print(json.dumps({
+            "success": False,
+            "error": "Usage: comments <url> [max_results] [--format=ndjson] [--top=N] [--aggregate=author]",
+        }))
         sys.exit(1)
 
-    url = args[0]
-    max_results = int(args[1]) if len(args) > 1 else 100
+    url = positional[0]
+    max_results = int(positional[1]) if len(positional) > 1 else 100
+    aggregate = options.get("aggregate")
+    if aggregate is not None and aggregate not in COMMENT_AGGREGATES:
+        print(json.dumps({
+            "success": False,
+            "error": f"Unknown aggregate: {aggregate}",
+            "available": list(COMMENT_AGGREGATES),
+        }))
+        sys.exit(1)
 
     try:
         video_id = extract_video_id(url)
-        result = get_comments(video_id, max_results)
-        print(json.dumps(result, indent=2))
+        top = int(options.get("top", 0))
     except ValueError as e:
         print(json.dumps({"success": False, "error": str(e)}))
         sys.exit(1)
 
+    # Rankings are a single result, so they ignore --format=ndjson
+    if top or aggregate or options.get("format") != "ndjson":
+        print_json(get_comments(video_id, max_results, top, aggregate))
+        return
+
+    # Stream one thread per line as pages arrive
+    try:
+        for comment in iter_comments(video_id, max_results):
+            write_ndjson(comment)
+    except QuotaExceeded as e:
+        write_ndjson({"quota_exhausted": True, "error": str(e), "quota": QUOTA.status()})
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
+
 
 def cmd_summarize(args: list[str]) -> None:
     """Handle summarize command - outputs transcript formatted for LLM processing."""
-    if not args:
-        print(json.dumps({"success": False, "error": "Usage: summarize <url> [pattern]"}))
+    positional, options = parse_options(args)
+    if not positional:
+        print(json.dumps({
+            "success": False,
+            "error": "Usage: summarize <url> [pattern] [--max-tokens=4000] [--window=600]",
+        }))
         sys.exit(1)
 
-    url = args[0]
-    pattern = args[1] if len(args) > 1 else "extract_wisdom"
+    url = positional[0]
+    pattern = positional[1] if len(positional) > 1 else "extract_wisdom"
 
     try:
         video_id = extract_video_id(url)
+        max_tokens = int(options.get("max-tokens", DEFAULT_CHUNK_TOKENS))
+        window = float(options.get("window", DEFAULT_WINDOW_SECONDS))
 
         # Get video info
         info_result = get_video_info(video_id)
@@ -395,7 +3081,7 @@ def cmd_summarize(args: list[str]) -> None:
             sys.exit(1)
 
         # Get transcript
-        transcript_result = get_transcript(video_id, "text")
+        transcript_result = fetch_transcript(video_id)
         if not transcript_result["success"]:
             print(json.dumps(transcript_result))
             sys.exit(1)
@@ -404,8 +3090,18 @@ def cmd_summarize(args: list[str]) -> None:
         chapters_result = get_chapters(video_id)
 
         info = info_result["info"]
-        transcript = transcript_result["transcript"]
+        snippets = transcript_result["snippets"]
+        transcript = render_transcripts(snippets, ["text"])["text"]
         chapters = chapters_result.get("chapters", [])
+        chunks = chunk_transcript(snippets, chapters, max_tokens, window)
+
+        if len(chunks) > 1:
+            prompt_hint = (
+                f"Apply the '{pattern}' Fabric pattern to each chunk independently, "
+                "then combine the per-chunk results into one analysis."
+            )
+        else:
+            prompt_hint = f"Apply the '{pattern}' Fabric pattern to analyze this transcript."
 
         # Format for LLM processing
         output = {
@@ -419,10 +3115,16 @@ def cmd_summarize(args: list[str]) -> None:
             "suggested_pattern": pattern,
             "chapters": chapters,
             "transcript": transcript,
-            "prompt_hint": f"Apply the '{pattern}' Fabric pattern to analyze this transcript.",
+            "chunking": {
+                "strategy": "chapters" if chapters else "windows",
+                "max_tokens": max_tokens,
+                "chunk_count": len(chunks),
+            },
+            "chunks": chunks,
+            "prompt_hint": prompt_hint,
         }
 
-        print(json.dumps(output, indent=2))
+        print_json(output)
 
     except ValueError as e:
         print(json.dumps({"success": False, "error": str(e)}))
@@ -454,85 +3156,769 @@ def cmd_pipe(args: list[str]) -> None:
 
 
 def cmd_all(args: list[str]) -> None:
-    """Handle all command - extract everything."""
-    if not args:
-        print(json.dumps({"success": False, "error": "Usage: all <url>"}))
+    """Handle all command - extract everything.
+
+    With --format=ndjson each section is written as its own line as soon as its
+    fetch finishes, and comments stream one thread per line.
+    """
+    positional, options = parse_options(args)
+    if not positional:
+        print(json.dumps({"success": False, "error": "Usage: all <url> [--format=ndjson]"}))
         sys.exit(1)
 
     try:
-        video_id = extract_video_id(args[0])
-
-        # Get all data
-        info_result = get_video_info(video_id)
-        transcript_result = get_transcript(video_id, "text")
-        transcript_json = get_transcript(video_id, "json")
-        chapters_result = get_chapters(video_id)
-        comments_result = get_comments(video_id)
+        video_id = extract_video_id(positional[0])
+    except ValueError as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
 
-        result = {
-            "success": True,
-            "video_id": video_id,
-        }
+    stream = options.get("format") == "ndjson"
+    result: dict[str, Any] = {
+        "success": True,
+        "video_id": video_id,
+    }
 
-        if info_result["success"]:
-            result["info"] = info_result["info"]
+    def emit(section: str, data: Any) -> None:
+        if stream:
+            write_ndjson({"video_id": video_id, "section": section, "data": data})
         else:
-            result["info_error"] = info_result.get("error")
+            result[section] = data
 
-        if transcript_result["success"]:
-            result["transcript_text"] = transcript_result["transcript"]
-        else:
-            result["transcript_error"] = transcript_result.get("error")
+    info_result = get_video_info(video_id)
+    if info_result["success"]:
+        emit("info", info_result["info"])
+    else:
+        emit("info_error", info_result.get("error"))
+
+    transcript_result = fetch_transcript(video_id)
+    if transcript_result["success"]:
+        rendered = render_transcripts(transcript_result["snippets"], ["text", "json"])
+        emit("transcript_text", rendered["text"])
+        emit("transcript_timed", rendered["json"])
+    else:
+        emit("transcript_error", transcript_result.get("error"))
+
+    chapters_result = get_chapters(video_id)
+    if chapters_result["success"]:
+        emit("chapters", chapters_result.get("chapters", []))
+
+    if stream:
+        try:
+            for comment in iter_comments(video_id):
+                emit("comments", comment)
+        except Exception as e:
+            emit("comments_error", str(e))
+        emit("quota", QUOTA.status())
+        write_ndjson({"video_id": video_id, "section": "end", "success": True})
+        return
+
+    comments_result = get_comments(video_id)
+    if comments_result["success"]:
+        emit("comments", comments_result.get("comments", []))
+        if comments_result.get("quota_exhausted"):
+            emit("comments_truncated", True)
+    else:
+        emit("comments_error", comments_result.get("error"))
+    if "quota" in comments_result:
+        emit("quota", comments_result["quota"])
+
+    print_json(result)
+
+
+def cmd_batch(args: list[str]) -> None:
+    """Handle batch command - process many videos concurrently, one JSON line per video."""
+    positional, options = parse_options(args)
+
+    resources = options.get("resources", "info,transcript").split(",")
+    unknown = [r for r in resources if r not in BATCH_RESOURCES]
+    if unknown:
+        print(json.dumps({
+            "success": False,
+            "error": f"Unknown resources: {', '.join(unknown)}",
+            "available": list(BATCH_RESOURCES),
+        }))
+        sys.exit(1)
+
+    try:
+        configure_backends({
+            backend: int(options[f"{backend}-workers"])
+            for backend in BACKEND_LIMITS
+            if f"{backend}-workers" in options
+        })
+        max_comments = int(options.get("max-results", 100))
+        workers = int(options.get("workers", sum(BACKEND_LIMITS.values())))
+        dedupe = options.get("dedupe")
+        if dedupe not in (None, "flag", "skip"):
+            raise ValueError(f"Unknown dedupe mode: {dedupe} (use flag or skip)")
+        dedupe_threshold = float(options.get("dedupe-threshold", DEDUPE_THRESHOLD))
+        sources = read_batch_sources(positional[0] if positional else None)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
 
-        if transcript_json["success"]:
-            result["transcript_timed"] = transcript_json["transcript"]
+    output_lock = threading.Lock()
+
+    def emit(record: dict[str, Any]) -> None:
+        with output_lock:
+            write_ndjson(record)
+
+    video_ids = []
+    seen = set()
+    for source in sources:
+        try:
+            expanded = expand_source(source)
+        except Exception as e:
+            emit({"source": source, "success": False, "error": str(e)})
+            continue
+        for video_id in expanded:
+            if video_id not in seen:
+                seen.add(video_id)
+                video_ids.append(video_id)
+
+    journal_path = (
+        Path(options["journal"]).expanduser() if "journal" in options
+        else get_journal_path(sources, resources, max_comments)
+    )
+    journal = BatchJournal(journal_path, resume="resume" in options)
+    if "resume" in options:
+        finished = [vid for vid in video_ids if journal.video_done(vid, resources)]
+        journal.prune(resources)
+        video_ids = [vid for vid in video_ids if not journal.video_done(vid, resources)]
+        sys.stderr.write(
+            f"resuming from {journal_path}: {len(finished)} videos done, {len(video_ids)} to go\n"
+        )
 
-        if chapters_result["success"]:
-            result["chapters"] = chapters_result.get("chapters", [])
+    incomplete = 0
+    # Only this many videos are in flight (or finished but not yet emitted) at once
+    window = max(workers, 1) * 2
+    in_flight: dict[Future, str] = {}
+
+    def collect(limit: int) -> None:
+        """Emit finished videos until at most limit remain in flight."""
+        nonlocal incomplete
+        while len(in_flight) > limit:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                video_id = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    record = {"video_id": video_id, "success": False, "error": str(e)}
+                if not record["success"] or "comments_truncated" in record or any(
+                    key.endswith("_error") for key in record
+                ):
+                    incomplete += 1
+                emit(record)
 
-        if comments_result["success"]:
-            result["comments"] = comments_result.get("comments", [])
-        else:
-            result["comments_error"] = comments_result.get("error")
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            # Metadata is looked up 50 videos per Data API call; yt-dlp covers the rest per video
+            bulk_info = "info" in resources and get_youtube_api_key() is not None
+            for start in range(0, len(video_ids), VIDEOS_BATCH_SIZE):
+                chunk = video_ids[start:start + VIDEOS_BATCH_SIZE]
+                infos = get_video_infos(chunk, fallback=False) if bulk_info else {}
+                for video_id in chunk:
+                    collect(window - 1)
+                    future = pool.submit(
+                        process_video, video_id, resources, max_comments, journal,
+                        dedupe, dedupe_threshold, infos.pop(video_id, None),
+                    )
+                    in_flight[future] = video_id
+            collect(0)
+    finally:
+        journal.close()
+
+    # A clean run leaves nothing to resume; otherwise keep the journal for --resume
+    if incomplete:
+        sys.stderr.write(f"{incomplete} videos incomplete; rerun with --resume to continue from {journal_path}\n")
+    else:
+        journal_path.unlink(missing_ok=True)
+
+    if UPSTREAM.counters:
+        emit({"upstream": UPSTREAM.stats()})
+
+
+def cmd_sync(args: list[str]) -> None:
+    """Handle sync command - fetch new uploads from followed channels and playlists."""
+    positional, options = parse_options(args)
+    resources = options.get("resources", "info,transcript").split(",")
+    unknown = [r for r in resources if r not in BATCH_RESOURCES]
+    if unknown:
+        print(json.dumps({
+            "success": False,
+            "error": f"Unknown resources: {', '.join(unknown)}",
+            "available": list(BATCH_RESOURCES),
+        }))
+        sys.exit(1)
+
+    output_dir = get_output_dir(options.get("output-dir"))
+    manifest = load_sync_manifest(output_dir)
+    sources = positional or list(manifest["sources"])
+    if not sources:
+        print(json.dumps({
+            "success": False,
+            "error": "Usage: sync <channel-or-playlist-url>... [--limit=N] [--resources=info,transcript]",
+        }))
+        sys.exit(1)
 
-        print(json.dumps(result, indent=2))
+    limit = int(options.get("limit", 0))
+    results = []
+    for url in sources:
+        state = manifest["sources"].setdefault(url, {})
+        try:
+            results.append(sync_source(url, state, output_dir, resources, limit))
+        except Exception as e:
+            results.append({"url": url, "error": str(e)})
+        # Persist after every source so an interrupted run keeps its progress
+        save_sync_manifest(output_dir, manifest)
+
+    print_json({
+        "success": not any("error" in r for r in results),
+        "manifest": str(get_sync_manifest_path(output_dir)),
+        "sources": results,
+    })
+
+
+def cmd_search(args: list[str]) -> None:
+    """Handle search command - full-text search over indexed transcripts."""
+    positional, options = parse_options(args)
+
+    if "reindex" in options:
+        added = sum(
+            index_transcript(video_id, fetched["snippets"], fetched.get("language"))
+            for video_id, _, fetched in CACHE.iter_kind("transcript")
+        )
+        print_json({"success": True, "indexed": added, "index": INDEX.stats()})
+        return
 
+    if not positional:
+        print(json.dumps({
+            "success": False,
+            "error": "Usage: search <query> [--limit=20] [--video=URL] | search --reindex",
+        }))
+        sys.exit(1)
+
+    try:
+        limit = int(options.get("limit", 20))
+        video_id = extract_video_id(options["video"]) if "video" in options else None
     except ValueError as e:
         print(json.dumps({"success": False, "error": str(e)}))
         sys.exit(1)
 
+    query = " ".join(positional)
+    hits = INDEX.search(query, limit, video_id)
+    print_json({"success": True, "query": query, "hit_count": len(hits), "hits": hits})
 
-def main() -> None:
-    if len(sys.argv) < 2:
+
+def cmd_dedupe(args: list[str]) -> None:
+    """Handle dedupe command - find near-duplicate transcripts in the local corpus."""
+    positional, options = parse_options(args)
+
+    if "rebuild" in options:
+        added = 0
+        for video_id, _, fetched in CACHE.iter_kind("transcript"):
+            with contextlib.suppress(sqlite3.Error):
+                added += DEDUPE.add(video_id, fetched["snippets"], fetched.get("language"))
+        print_json({"success": True, "added": added, "index": DEDUPE.stats()})
+        return
+
+    try:
+        threshold = float(options.get("threshold", DEDUPE_THRESHOLD))
+        video_ids = [extract_video_id(url) for url in positional]
+    except ValueError as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
+
+    if not video_ids:
+        clusters = DEDUPE.clusters(threshold)
+        print_json({
+            "success": True,
+            "threshold": threshold,
+            "cluster_count": len(clusters),
+            "clusters": clusters,
+            "index": DEDUPE.stats(),
+        })
+        return
+
+    videos = []
+    for video_id in video_ids:
+        fetched = fetch_transcript(video_id)
+        if not fetched["success"]:
+            videos.append({"video_id": video_id, "success": False, "error": fetched["error"]})
+            continue
+        DEDUPE.add(video_id, fetched["snippets"], fetched.get("language"))
+        videos.append({"video_id": video_id, "success": True, "duplicates": DEDUPE.similar(video_id, threshold)})
+    print_json({"success": any(v["success"] for v in videos), "threshold": threshold, "videos": videos})
+
+
+def cmd_export(args: list[str]) -> None:
+    """Handle export command - append the corpus to partitioned Parquet or Arrow files."""
+    positional, options = parse_options(args)
+    fmt = options.get("format", "parquet")
+    if fmt not in EXPORT_FORMATS:
         print(json.dumps({
             "success": False,
-            "error": "Usage: main.py <action> [args...]",
-            "actions": ["transcript", "chapters", "info", "comments", "summarize", "pipe", "all"],
+            "error": f"Unknown export format: {fmt}",
+            "available": list(EXPORT_FORMATS),
         }))
         sys.exit(1)
 
-    action = sys.argv[1]
-    args = sys.argv[2:]
+    output_dir = Path(options["output-dir"]).expanduser() if "output-dir" in options else get_output_dir() / "export"
+
+    try:
+        result = export_corpus(output_dir, fmt, positional)
+    except (OSError, ValueError) as e:
+        result = {"success": False, "error": str(e)}
+    print_json(result)
+    if not result["success"]:
+        sys.exit(1)
+
+
+REFRESH_RESOURCES = ("info", "comments")
 
-    commands = {
-        "transcript": cmd_transcript,
-        "chapters": cmd_chapters,
-        "info": cmd_info,
-        "comments": cmd_comments,
-        "summarize": cmd_summarize,
-        "pipe": cmd_pipe,
-        "all": cmd_all,
+
+def refresh_info(video_id: str) -> str:
+    """Revalidate cached metadata with a conditional videos.list probe; re-extract only when it changed.
+
+    Returns "unchanged" (304), "changed", "fetched" (nothing was cached), or
+    "baseline" (cached before ETags were kept; its ETag is recorded now).
+    """
+    cached = CACHE.lookup("info", video_id)
+    etag = cached[1] if cached else None
+    with TRACER.span("data-api.videos", video_id) as event:
+        response = data_api_call(
+            "videos.list",
+            lambda youtube: youtube.videos().list(part="snippet,contentDetails", id=video_id),
+            etag=etag,
+        )
+        event["cache"] = "not_modified" if response is None else "miss"
+
+    if response is None:
+        CACHE.touch("info", video_id)
+        return "unchanged"
+    if not response.get("items"):
+        raise RuntimeError(f"Video unavailable: {video_id}")
+    if cached and etag is None:
+        CACHE.touch("info", video_id, etag=response.get("etag"))
+        return "baseline"
+
+    CACHE.purge(video_id, "info")
+    reset_memo(video_id)
+    info_result = get_video_info(video_id)
+    if not info_result["success"]:
+        raise RuntimeError(info_result["error"])
+    CACHE.touch("info", video_id, etag=response.get("etag"))
+    return "changed" if cached else "fetched"
+
+
+def refresh_comments(video_id: str, max_comments: int) -> str:
+    """Re-page comments conditionally; "unchanged" when every page came back 304."""
+    first_page = f":{min(max_comments, COMMENT_PAGE_SIZE) if max_comments else COMMENT_PAGE_SIZE}"
+    had_pages = CACHE.lookup("comment-page", video_id, first_page) is not None
+    result = get_comments(video_id, max_comments)
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    if not result["pages"]["fetched"]:
+        return "unchanged"
+    return "changed" if had_pages else "fetched"
+
+
+def refresh_video(video_id: str, resources: Iterable[str], max_comments: int) -> dict[str, Any]:
+    """Refresh the requested resources of one watched video and say which changed."""
+    result: dict[str, Any] = {"video_id": video_id}
+    refreshers = {"info": refresh_info, "comments": lambda vid: refresh_comments(vid, max_comments)}
+    for resource in resources:
+        try:
+            result[resource] = refreshers[resource](video_id)
+        except Exception as e:
+            result[resource] = "error"
+            result[f"{resource}_error"] = str(e)
+    result["changed"] = any(result.get(resource) == "changed" for resource in resources)
+    return result
+
+
+def refresh_watched(
+    video_ids: list[str] | None, resources: list[str], max_comments: int
+) -> dict[str, Any]:
+    """Conditionally refresh videos (default: every cached one) and report what changed."""
+    if video_ids:
+        targets = {video_id: resources for video_id in video_ids}
+    else:
+        # Only revalidate what is already cached for each video
+        targets = {}
+        for resource, kind in (("info", "info"), ("comments", "comment-page")):
+            if resource in resources:
+                for video_id in CACHE.video_ids(kind):
+                    targets.setdefault(video_id, []).append(resource)
+
+    spent_before = QUOTA.spent()
+    with ThreadPoolExecutor(max_workers=BACKEND_LIMITS["data-api"]) as pool:
+        videos = list(pool.map(lambda item: refresh_video(item[0], item[1], max_comments), targets.items()))
+        reset_memo()
+
+    return {
+        "success": True,
+        "checked": len(videos),
+        "changed": [v["video_id"] for v in videos if v["changed"]],
+        "unchanged": sum(
+            all(v.get(resource) == "unchanged" for resource in targets[v["video_id"]]) for v in videos
+        ),
+        "errors": sum(any(key.endswith("_error") for key in v) for v in videos),
+        "quota_spent": QUOTA.spent() - spent_before,
+        "videos": videos,
+        "quota": QUOTA.status(),
     }
 
-    if action not in commands:
+
+def cmd_cache(args: list[str]) -> None:
+    """Handle cache command - inspect, warm, and purge the local cache."""
+    positional, options = parse_options(args)
+    op = positional[0] if positional else "stats"
+
+    if op == "stats":
+        print_json({"success": True, "cache": CACHE.stats()})
+
+    elif op == "warm":
+        if len(positional) < 2:
+            print(json.dumps({"success": False, "error": "Usage: cache warm <url> [url...]"}))
+            sys.exit(1)
+
+        warmed = []
+        video_ids, errors = {}, {}
+        for url in positional[1:]:
+            try:
+                video_ids[url] = extract_video_id(url)
+            except ValueError as e:
+                errors[url] = str(e)
+        infos = get_video_infos(video_ids.values())
+        for url in positional[1:]:
+            if url in errors:
+                warmed.append({"url": url, "success": False, "error": errors[url]})
+                continue
+            video_id = video_ids[url]
+            info_result = infos[video_id]
+            transcript_result = fetch_transcript(video_id)
+            warmed.append({
+                "video_id": video_id,
+                "info": info_result["success"],
+                "transcript": transcript_result["success"],
+            })
+        print_json({"success": True, "warmed": warmed})
+
+    elif op == "purge":
+        video_id = None
+        if len(positional) > 1:
+            try:
+                video_id = extract_video_id(positional[1])
+            except ValueError as e:
+                print(json.dumps({"success": False, "error": str(e)}))
+                sys.exit(1)
+        removed = CACHE.purge(video_id, options.get("kind"), expired="expired" in options)
+        print(json.dumps({"success": True, "removed": removed}))
+
+    elif op == "refresh":
+        resources = options.get("resources", ",".join(REFRESH_RESOURCES)).split(",")
+        try:
+            unknown = [r for r in resources if r not in REFRESH_RESOURCES]
+            if unknown:
+                raise ValueError(f"Unknown resources: {', '.join(unknown)}")
+            video_ids = [extract_video_id(url) for url in positional[1:]]
+            max_comments = int(options.get("max-results", 100))
+        except ValueError as e:
+            print(json.dumps({"success": False, "error": str(e)}))
+            sys.exit(1)
+        if not get_youtube_api_key():
+            print(json.dumps({"success": False, "error": "cache refresh needs YOUTUBE_API_KEY for conditional requests"}))
+            sys.exit(1)
+        print_json(refresh_watched(video_ids, resources, max_comments))
+
+    else:
         print(json.dumps({
             "success": False,
-            "error": f"Unknown action: {action}",
-            "available": list(commands.keys()),
+            "error": "Usage: cache [stats|warm <url>...|purge [url] [--kind=KIND] [--expired]"
+                     "|refresh [url...] [--resources=info,comments]]",
         }))
         sys.exit(1)
 
-    commands[action](args)
+
+# Actions that read stdin, manage the daemon, or run long always run in-process
+LOCAL_ACTIONS = {"batch", "serve", "sync", "export"}
+# Long operations of otherwise quick actions, as (action, argument) pairs
+LOCAL_OPERATIONS = {("cache", "refresh"), ("search", "--reindex"), ("dedupe", "--rebuild")}
+# Client settings a forwarded request carries, so the daemon runs it as the client would
+FORWARDED_ENV = (
+    "YOUTUBE_API_KEY",
+    "YOUTUBE_API_QUOTA",
+    "PAIS_OBSERVABILITY",
+    "PAIS_OBSERVABILITY_FILE",
+    "PAIS_YOUTUBE_CACHE_MAX_MB",
+)
+
+
+def runs_locally(action: str, args: list[str]) -> bool:
+    """Whether an invocation must run in the calling process rather than the daemon.
+
+    The daemon serves one request at a time and replies with all of its output,
+    so streamed NDJSON and long operations run where they were invoked.
+    """
+    if action in LOCAL_ACTIONS or "--format=ndjson" in args:
+        return True
+    words = {arg.partition("=")[0] for arg in args}
+    return any(action == local_action and word in words for local_action, word in LOCAL_OPERATIONS)
+
+
+def configure_from_environment() -> None:
+    """Re-read the settings taken from the environment at import time."""
+    previous_key = _credentials.pop("youtube", None)
+    if get_youtube_api_key() != previous_key:
+        DATA_API_CLIENTS.clear()
+    QUOTA.daily_budget = int(os.environ.get("YOUTUBE_API_QUOTA", DATA_API_DAILY_QUOTA))
+    max_mb = os.environ.get("PAIS_YOUTUBE_CACHE_MAX_MB")
+    CACHE.max_bytes = int(max_mb) * 1024 * 1024 if max_mb else CACHE_MAX_BYTES
+    TRACER.configure()
+
+
+@contextlib.contextmanager
+def client_context(cwd: str | None, env: dict[str, str | None] | None) -> Iterator[None]:
+    """Run a forwarded request in the client's directory and settings, then restore the daemon's."""
+    saved_cwd = os.getcwd()
+    saved_env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+
+    def apply(values: dict[str, str | None]) -> None:
+        for name in FORWARDED_ENV:
+            if values.get(name) is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = values[name]
+        configure_from_environment()
+
+    try:
+        if cwd:
+            os.chdir(cwd)
+        if env is not None:
+            apply(env)
+        yield
+    finally:
+        os.chdir(saved_cwd)
+        if env is not None:
+            apply(saved_env)
+
+
+def get_daemon_socket() -> Path:
+    """Get the Unix socket path the warm daemon listens on (env PAIS_YOUTUBE_DAEMON_SOCKET)."""
+    override = os.environ.get("PAIS_YOUTUBE_DAEMON_SOCKET")
+    return Path(override).expanduser() if override else get_cache_dir() / "daemon.sock"
+
+
+def daemon_request(method: str, params: list[str], socket_path: Path | None = None) -> dict[str, Any] | None:
+    """Send one JSON-RPC request to the daemon; None when no daemon is listening."""
+    socket_path = socket_path or get_daemon_socket()
+    if not socket_path.exists():
+        return None
+
+    request = {
+        "jsonrpc": "2.0",
+        "id": os.getpid(),
+        "method": method,
+        "params": params,
+        "cwd": os.getcwd(),
+        "env": {name: os.environ.get(name) for name in FORWARDED_ENV},
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+            with sock.makefile("rwb") as stream:
+                stream.write(json.dumps(request).encode() + b"\n")
+                stream.flush()
+                line = stream.readline()
+    except OSError:
+        return None
+
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def run_action(action: str, args: list[str]) -> int:
+    """Dispatch one action in-process and return its exit code."""
+    args = list(args)
+    cache_enabled = CACHE.enabled
+    if "--no-cache" in args:
+        args.remove("--no-cache")
+        CACHE.enabled = False
+    if "--compact" in args:
+        args.remove("--compact")
+        OUTPUT_OPTIONS["compact"] = True
+    if "--timings" in args:
+        args.remove("--timings")
+        TRACER.collected = []
+    TRACER.action = action
+    UPSTREAM.reset_counters()
+
+    try:
+        if action not in COMMANDS:
+            print(json.dumps({
+                "success": False,
+                "error": f"Unknown action: {action}",
+                "available": list(COMMANDS.keys()),
+            }))
+            return 1
+
+        with TRACER.span("action"):
+            COMMANDS[action](args)
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        CACHE.enabled = cache_enabled
+        OUTPUT_OPTIONS["compact"] = False
+        TRACER.action = None
+        TRACER.collected = None
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Serve newline-delimited JSON-RPC requests, each running one action."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                method = request["method"]
+                params = [str(p) for p in request.get("params", [])]
+            except (ValueError, KeyError, TypeError) as e:
+                self.respond(None, error={"code": -32600, "message": f"Invalid request: {e}"})
+                continue
+
+            if method == "ping":
+                self.respond(request.get("id"), result={"pid": os.getpid()})
+                continue
+
+            if method == "shutdown":
+                self.respond(request.get("id"), result={"stopping": True})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+            if runs_locally(method, params):
+                self.respond(request.get("id"), error={"code": -32601, "message": f"Not served: {method}"})
+                continue
+
+            # Each request is its own invocation: fresh memo, captured output, the client's cwd and env
+            reset_memo()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            try:
+                with (
+                    client_context(request.get("cwd"), request.get("env")),
+                    contextlib.redirect_stdout(stdout),
+                    contextlib.redirect_stderr(stderr),
+                ):
+                    exit_code = run_action(method, params)
+            except Exception as e:
+                # The action may have done work already; the exit code tells the client not to rerun it
+                self.respond(request.get("id"), error={
+                    "code": -32000,
+                    "message": f"Request failed: {e}",
+                    "data": {
+                        "stdout": stdout.getvalue(),
+                        "stderr": stderr.getvalue() + traceback.format_exc(),
+                        "exit_code": 1,
+                    },
+                })
+                continue
+
+            self.respond(request.get("id"), result={
+                "stdout": stdout.getvalue(),
+                "stderr": stderr.getvalue(),
+                "exit_code": exit_code,
+            })
+
+    def respond(self, request_id: Any, result: Any = None, error: dict | None = None) -> None:
+        response: dict[str, Any] = {"jsonrpc": "2.0", "id": request_id}
+        if error is not None:
+            response["error"] = error
+        else:
+            response["result"] = result
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        self.wfile.flush()
+
+
+def cmd_serve(args: list[str]) -> None:
+    """Handle serve command - keep imports and clients warm behind a Unix socket."""
+    _, options = parse_options(args)
+    socket_path = Path(options["socket"]).expanduser() if "socket" in options else get_daemon_socket()
+
+    if "stop" in options:
+        response = daemon_request("shutdown", [], socket_path)
+        print(json.dumps({"success": response is not None, "socket": str(socket_path)}))
+        return
+
+    if daemon_request("ping", [], socket_path) is not None:
+        print(json.dumps({"success": False, "error": f"Daemon already running on {socket_path}"}))
+        sys.exit(1)
+    socket_path.unlink(missing_ok=True)
+
+    # Pay the heavy imports once, up front
+    for module in ("yt_dlp", "youtube_transcript_api", "googleapiclient.discovery"):
+        with contextlib.suppress(ImportError):
+            __import__(module)
+
+    # Requests run one at a time on this thread, so thread-local clients stay warm
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(socket_path), DaemonHandler)
+    finally:
+        os.umask(old_umask)
+
+    sys.stderr.write(f"youtube daemon listening on {socket_path}\n")
+    try:
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        socket_path.unlink(missing_ok=True)
+
+
+COMMANDS = {
+    "transcript": cmd_transcript,
+    "chapters": cmd_chapters,
+    "info": cmd_info,
+    "comments": cmd_comments,
+    "summarize": cmd_summarize,
+    "pipe": cmd_pipe,
+    "all": cmd_all,
+    "batch": cmd_batch,
+    "sync": cmd_sync,
+    "search": cmd_search,
+    "dedupe": cmd_dedupe,
+    "export": cmd_export,
+    "cache": cmd_cache,
+    "serve": cmd_serve,
+}
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(json.dumps({
+            "success": False,
+            "error": "Usage: main.py <action> [args...]",
+            "actions": list(COMMANDS.keys()),
+        }))
+        sys.exit(1)
+
+    action = sys.argv[1]
+    args = sys.argv[2:]
+
+    # Forward to a running daemon when there is one; fall back to running here
+    if not runs_locally(action, args) and not os.environ.get("PAIS_YOUTUBE_NO_DAEMON"):
+        response = daemon_request(action, args)
+        # A failed action still carries its output and exit code; only unserved requests run here
+        outcome = response and (response.get("result") or response.get("error", {}).get("data"))
+        if outcome and "exit_code" in outcome:
+            sys.stdout.write(outcome["stdout"])
+            sys.stderr.write(outcome["stderr"])
+            sys.exit(outcome["exit_code"])
+
+    sys.exit(run_action(action, args))
 
 
 if __name__ == "__main__":